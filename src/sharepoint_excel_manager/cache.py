@@ -0,0 +1,62 @@
+"""
+Per-user cache storage for SharePoint Excel Manager
+Keeps cached listings, workbooks and table metadata readable only by the user
+"""
+import os
+import stat
+from pathlib import Path
+
+# Root of all on-disk caches; each cache uses its own subdirectory
+CACHE_ROOT = Path.home() / ".sharepoint_excel_cache"
+
+
+def private_cache_dir(name: str) -> Path:
+    """Get a cache subdirectory that only the current user can access
+    
+    The directories are created with mode 0700. An existing directory that is
+    a symlink or belongs to another user is refused with PermissionError, so
+    nobody else can read the cache or plant entries in it.
+    """
+    cache_dir = CACHE_ROOT / name
+    for directory in (CACHE_ROOT, cache_dir):
+        try:
+            directory.mkdir(mode=0o700)
+        except FileExistsError:
+            pass
+        _check_private_dir(directory)
+    return cache_dir
+
+
+def _check_private_dir(directory: Path) -> None:
+    """Ensure a directory is owned by the current user and closed to others"""
+    if os.name != 'posix':
+        # Windows profile directories are already private to the user
+        return
+    
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"Cache directory {directory} is not owned by the current user")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(directory, 0o700)
+
+
+def open_private_file(path: Path):
+    """Open a new file for binary writing, readable only by the user
+    
+    Any existing file is removed first, so its permissions are not inherited.
+    """
+    path.unlink(missing_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    return os.fdopen(fd, 'wb')
+
+
+def write_private_file(path: Path, data: bytes) -> None:
+    """Write a file readable only by the user, replacing the old one atomically"""
+    temp_file = path.with_name(f"{path.name}.tmp")
+    try:
+        with open_private_file(temp_file) as f:
+            f.write(data)
+        os.replace(temp_file, path)
+    except OSError:
+        temp_file.unlink(missing_ok=True)
+        raise
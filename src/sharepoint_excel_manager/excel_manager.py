@@ -2,18 +2,97 @@
 Excel file management module for SharePoint Excel Manager
 Handles downloading, opening, and analyzing Excel files
 """
+import asyncio
+import atexit
+import functools
+import hashlib
+import itertools
+import json
 import logging
 import os
+import posixpath
+import shutil
+import sys
 import tempfile
+import threading
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import openpyxl
-import pandas as pd
-from openpyxl.utils.dataframe import dataframe_to_rows
+from .cache import open_private_file, private_cache_dir, write_private_file
 
 logger = logging.getLogger(__name__)
 
+# Table metadata persisted between runs in the per-user cache, keyed by
+# SharePoint item id + the eTag SharePoint reported for the scanned version
+METADATA_CACHE_NAME = "metadata"
+
+# Downloaded workbooks kept between runs in the per-user cache, one copy per
+# SharePoint item with its eTag in a sidecar file. Once the copies exceed
+# FILE_CACHE_MAX_BYTES the least recently used ones are removed
+FILE_CACHE_NAME = "files"
+FILE_CACHE_MAX_BYTES = 512 << 20
+
+# XML namespaces used when reading Excel Table parts from the workbook package
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELATIONSHIP_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_RELATIONSHIP_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# Number of header cells kept per worksheet, starting at the first non-empty column
+HEADER_SAMPLE_COLUMNS = 10
+
+# Upper bound on downloads running at once in download_and_open_many
+MAX_CONCURRENT_DOWNLOADS = 8
+
+# Temp directory shared by all ExcelManager instances in this process
+_shared_temp_dir = None
+_shared_temp_lock = threading.Lock()
+
+
+def _get_shared_temp_dir() -> str:
+    """Get the process-wide temp directory, creating it on first use"""
+    global _shared_temp_dir
+    with _shared_temp_lock:
+        if _shared_temp_dir is None:
+            _shared_temp_dir = tempfile.mkdtemp(prefix="sharepoint_excel_")
+            atexit.register(shutil.rmtree, _shared_temp_dir, ignore_errors=True)
+        return _shared_temp_dir
+
+
+@dataclass
+class TableInfo:
+    """Metadata for a worksheet or Excel Table found in a workbook"""
+    # Explicit slots keep the many records built per workbook small
+    __slots__ = (
+        "name", "type", "worksheet", "has_data", "has_headers", "header_row",
+        "total_rows", "total_columns", "data_rows", "sample_headers", "range",
+        "description",
+    )
+    
+    name: str
+    type: str  # worksheet, table
+    worksheet: Optional[str]  # Containing sheet for Excel Tables
+    has_data: bool
+    has_headers: bool
+    header_row: Optional[int]
+    total_rows: int
+    total_columns: int
+    data_rows: int
+    sample_headers: List[str]
+    range: Optional[str]  # Cell range for Excel Tables
+    description: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert table info to dictionary"""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TableInfo':
+        """Create table info from dictionary"""
+        return cls(**{key: data.get(key) for key in cls.__slots__})
+
 
 class ExcelManager:
     """Manages Excel file operations including downloading, opening, and table extraction"""
@@ -24,10 +103,17 @@ class ExcelManager:
         self.current_workbook = None
         self.current_file_path = None
         self.current_file_info = None
+        self._workbook_file = None
+        self._file_stat = None
+        self._unlinked = False
+        self._tables_cache = {}
+        
+        # eTags read from SharePoint by item id, so one file is checked once
+        self._current_etags = {}
     
     def __enter__(self):
-        """Context manager entry - create temp directory"""
-        self.temp_dir = tempfile.mkdtemp(prefix="sharepoint_excel_")
+        """Context manager entry - attach to the shared temp directory"""
+        self.temp_dir = _get_shared_temp_dir()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -39,163 +125,500 @@ class ExcelManager:
         if self.current_workbook:
             try:
                 self.current_workbook.close()
-            except:
+            except Exception:
                 pass
             self.current_workbook = None
         
-        if self.temp_dir and os.path.exists(self.temp_dir):
+        if self._workbook_file:
+            self._workbook_file.close()
+            self._workbook_file = None
+        
+        self._tables_cache.clear()
+        
+        # Only this instance's download is removed; the shared temp directory
+        # itself is removed at interpreter exit
+        if self.current_file_path and not self._unlinked:
             try:
-                import shutil
-                shutil.rmtree(self.temp_dir)
-            except Exception as e:
-                logger.warning(f"Could not remove temp directory: {e}")
+                Path(self.current_file_path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove temp file: {e}")
     
     async def download_and_open_excel_file(self, file_info: Dict) -> bool:
         """Download and open Excel file without displaying it"""
         try:
-            logger.info(f"Downloading Excel file: {file_info['name']}")
-            
-            # Create temp file path
-            file_name = file_info['name']
-            self.current_file_path = os.path.join(self.temp_dir, file_name)
-            self.current_file_info = file_info
-            
-            # Download the file
-            success = await self.sharepoint_client.download_file(file_info, self.current_file_path)
-            
-            if not success:
-                raise Exception("Failed to download file from SharePoint")
-            
-            # Open the Excel file (without displaying)
-            logger.info(f"Opening Excel file: {file_name}")
-            self.current_workbook = openpyxl.load_workbook(self.current_file_path, read_only=True)
-            
-            logger.info(f"Successfully opened Excel file: {file_name}")
+            await self._download_excel_file(file_info)
+            # Parsing the workbook blocks, so keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self._open_workbook)
             return True
             
         except Exception as e:
             logger.error(f"Error downloading/opening Excel file: {e}")
             return False
     
-    def get_available_tables(self) -> List[Dict]:
+    @classmethod
+    async def download_and_open_many(cls, sharepoint_client, file_infos: List[Dict]) -> List['ExcelManager']:
+        """Download several Excel files concurrently and open each one
+        
+        At most MAX_CONCURRENT_DOWNLOADS transfers run at once. Each workbook is
+        opened in a worker thread as soon as its own download finishes, so
+        parsing overlaps with the remaining downloads. Returns one
+        entered manager per file, in order; use is_file_open() to check which
+        succeeded. The caller is responsible for calling cleanup() on each.
+        """
+        loop = asyncio.get_running_loop()
+        managers = [cls(sharepoint_client).__enter__() for _ in file_infos]
+        download_slots = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        
+        async def download_and_open(manager, file_info):
+            try:
+                async with download_slots:
+                    await manager._download_excel_file(file_info)
+                await loop.run_in_executor(None, manager._open_workbook)
+            except Exception as e:
+                logger.error(f"Error downloading/opening Excel file: {e}")
+        
+        await asyncio.gather(*(
+            download_and_open(manager, file_info)
+            for manager, file_info in zip(managers, file_infos)
+        ))
+        return managers
+    
+    async def _download_excel_file(self, file_info: Dict) -> None:
+        """Download the file into a unique path in the temp directory"""
+        logger.info(f"Downloading Excel file: {file_info['name']}")
+        
+        # Create a unique temp file path (keeping the extension for openpyxl)
+        file_name = file_info['name']
+        fd, self.current_file_path = tempfile.mkstemp(suffix=f"_{file_name}", dir=self.temp_dir)
+        os.close(fd)
+        self.current_file_info = file_info
+        self._unlinked = False
+        
+        # Reuse the local copy when SharePoint still reports the same version.
+        # The listing may be cached and out of date, so the version is read
+        # from SharePoint now; copying a workbook blocks, so cache reads and
+        # writes run in a worker
+        loop = asyncio.get_running_loop()
+        etag = await self._current_etag(file_info)
+        cached_file = self._cached_file_path(file_info) if etag else None
+        if cached_file is not None and await loop.run_in_executor(None, self._copy_cached_file, cached_file, etag):
+            logger.info(f"Using cached copy of {file_name}")
+            return
+        
+        # Download the file
+        success = await self.sharepoint_client.download_file(file_info, self.current_file_path)
+        
+        if not success:
+            raise Exception("Failed to download file from SharePoint")
+        
+        # If the file changed again since its eTag was read, the copy is
+        # stored under the older eTag and simply misses next time
+        if cached_file is not None:
+            await loop.run_in_executor(None, self._store_cached_file, cached_file, etag)
+    
+    async def _current_etag(self, file_info: Dict) -> Optional[str]:
+        """Get the file's eTag as SharePoint reports it now, or None if unknown"""
+        file_id = file_info.get('id')
+        if file_id not in self._current_etags:
+            self._current_etags[file_id] = await self.sharepoint_client.get_item_etag(file_info)
+        return self._current_etags[file_id]
+    
+    def _cached_file_path(self, file_info: Dict) -> Optional[Path]:
+        """Get the local cache path for a SharePoint item, or None if it cannot be cached"""
+        file_id = file_info.get('id')
+        if not file_id:
+            return None
+        
+        try:
+            cache_dir = private_cache_dir(FILE_CACHE_NAME)
+        except OSError as e:
+            logger.warning(f"Workbook cache disabled: {e}")
+            return None
+        
+        digest = hashlib.sha1(file_id.encode('utf-8')).hexdigest()
+        return cache_dir / f"{digest}{Path(file_info['name']).suffix}"
+    
+    def _copy_cached_file(self, cached_file: Path, etag: str) -> bool:
+        """Copy the cached workbook to the current path if its eTag matches"""
+        try:
+            if cached_file.with_suffix('.etag').read_text(encoding='utf-8') != etag:
+                return False
+            shutil.copyfile(cached_file, self.current_file_path)
+            # Eviction goes by modification time, so mark the copy as used
+            os.utime(cached_file)
+            return True
+        except OSError:
+            return False
+    
+    def _store_cached_file(self, cached_file: Path, etag: str) -> None:
+        """Keep a copy of the downloaded workbook for later runs"""
+        try:
+            # Replace the workbook before recording its eTag, so a stale
+            # sidecar can never vouch for a partially written file
+            etag_file = cached_file.with_suffix('.etag')
+            etag_file.unlink(missing_ok=True)
+            temp_file = cached_file.with_suffix('.tmp')
+            with open(self.current_file_path, 'rb') as source, open_private_file(temp_file) as target:
+                shutil.copyfileobj(source, target)
+            os.replace(temp_file, cached_file)
+            write_private_file(etag_file, etag.encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not cache downloaded file: {e}")
+            return
+        
+        self._evict_cached_files(cached_file.parent)
+    
+    def _evict_cached_files(self, cache_dir: Path) -> None:
+        """Remove the least recently used workbooks while the cache is over its size limit"""
+        workbooks = []
+        try:
+            for entry in cache_dir.iterdir():
+                if entry.suffix not in ('.etag', '.tmp'):
+                    info = entry.stat()
+                    workbooks.append((info.st_mtime, info.st_size, entry))
+        except OSError as e:
+            logger.warning(f"Could not scan workbook cache: {e}")
+            return
+        
+        total_size = sum(size for _, size, _ in workbooks)
+        for _, size, workbook in sorted(workbooks):
+            if total_size <= FILE_CACHE_MAX_BYTES:
+                break
+            try:
+                workbook.with_suffix('.etag').unlink(missing_ok=True)
+                workbook.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not evict cached workbook: {e}")
+            total_size -= size
+    
+    def _open_workbook(self) -> None:
+        """Open the downloaded file as a read-only workbook"""
+        file_name = self.current_file_info['name']
+        
+        # Open the Excel file (without displaying). Only metadata and cell
+        # values are read, so formulas, VBA and external links are skipped.
+        # The workbook reads from our own handle so the file can be unlinked
+        logger.info(f"Opening Excel file: {file_name}")
+        import openpyxl  # Deferred so importing this module stays cheap
+        self._workbook_file = open(self.current_file_path, 'rb')
+        stat = os.fstat(self._workbook_file.fileno())
+        self._file_stat = (stat.st_mtime, stat.st_size)
+        self.current_workbook = openpyxl.load_workbook(
+            self._workbook_file,
+            read_only=True,
+            data_only=True,
+            keep_vba=False,
+            keep_links=False
+        )
+        
+        # On POSIX the open handle keeps the data readable, so the temp file
+        # does not need to stay on disk (Windows refuses to unlink open files)
+        if sys.platform != 'win32':
+            try:
+                os.unlink(self.current_file_path)
+                self._unlinked = True
+            except OSError:
+                pass
+        
+        logger.info(f"Successfully opened Excel file: {file_name}")
+    
+    def get_available_tables(self) -> List[TableInfo]:
         """Extract list of available tables/worksheets from the Excel file"""
         if not self.current_workbook:
             logger.error("No workbook is currently open")
             return []
         
         try:
-            tables = []
+            # The downloaded file does not change while it is open, so repeated
+            # calls can reuse the previous scan
+            cache_key = self._tables_cache_key()
+            if cache_key in self._tables_cache:
+                return list(self._tables_cache[cache_key])
             
-            # Get all worksheets
-            for sheet_name in self.current_workbook.sheetnames:
-                worksheet = self.current_workbook[sheet_name]
-                
-                # Get sheet dimensions
-                max_row = worksheet.max_row
-                max_col = worksheet.max_column
-                
-                # Check if sheet has data
-                has_data = max_row > 0 and max_col > 0
-                
-                # Try to detect if it looks like a table (has headers)
-                has_headers = False
-                header_row = None
-                
-                if has_data and max_row > 1:
-                    # Check first few rows for potential headers
-                    for row_num in range(1, min(4, max_row + 1)):
-                        row_values = []
-                        for col_num in range(1, min(max_col + 1, 11)):  # Check first 10 columns
-                            cell_value = worksheet.cell(row=row_num, column=col_num).value
-                            if cell_value is not None:
-                                row_values.append(str(cell_value))
-                        
-                        # If row has multiple non-empty values, consider it potential headers
-                        if len(row_values) >= 2:
-                            has_headers = True
-                            header_row = row_num
-                            break
-                
-                # Get sample headers if found
-                headers = []
-                if has_headers and header_row:
-                    for col_num in range(1, min(max_col + 1, 11)):  # First 10 columns
-                        cell_value = worksheet.cell(row=header_row, column=col_num).value
-                        if cell_value is not None:
-                            headers.append(str(cell_value))
-                        else:
-                            headers.append(f"Column{col_num}")
-                
-                # Calculate approximate data rows
-                data_rows = max(0, max_row - (header_row if header_row else 0))
-                
-                table_info = {
-                    "name": sheet_name,
-                    "type": "worksheet",
-                    "has_data": has_data,
-                    "has_headers": has_headers,
-                    "header_row": header_row,
-                    "total_rows": max_row,
-                    "total_columns": max_col,
-                    "data_rows": data_rows,
-                    "sample_headers": headers[:5],  # First 5 headers
-                    "description": self._generate_table_description(sheet_name, has_data, data_rows, max_col, headers)
-                }
-                
-                tables.append(table_info)
+            # Reopening the same SharePoint file version can reuse metadata
+            # stored by a previous run; the version is the eTag read from
+            # SharePoint before the download, not the listing's
+            disk_cache_file = self._metadata_cache_file(
+                self.current_file_info,
+                self._current_etags.get(self.current_file_info.get('id'))
+            )
+            cached_tables = self._load_cached_metadata(disk_cache_file)
+            if cached_tables is not None:
+                self._tables_cache[cache_key] = cached_tables
+                return list(cached_tables)
             
-            # Also check for named tables (Excel Table objects)
+            # Sheets are scanned one after another: parsing is CPU-bound, so
+            # threads would not speed it up, and openpyxl workbooks are not
+            # safe to share between threads
+            excel_tables = self._read_excel_tables()
+            tables = []
             for sheet_name in self.current_workbook.sheetnames:
-                worksheet = self.current_workbook[sheet_name]
-                
-                # Check for Excel Table objects
-                if hasattr(worksheet, 'tables') and worksheet.tables:
-                    for table_name, table in worksheet.tables.items():
-                        # Get table range and headers
-                        table_range = table.ref
-                        
-                        # Parse table range to get dimensions
-                        try:
-                            from openpyxl.utils import range_boundaries
-                            min_col, min_row, max_col, max_row = range_boundaries(table_range)
-                            
-                            table_headers = []
-                            if table.tableStyleInfo and hasattr(table.tableStyleInfo, 'showFirstColumn'):
-                                # Try to get actual headers
-                                for col_num in range(min_col, max_col + 1):
-                                    cell_value = worksheet.cell(row=min_row, column=col_num).value
-                                    if cell_value:
-                                        table_headers.append(str(cell_value))
-                            
-                            table_info = {
-                                "name": table_name,
-                                "type": "table",
-                                "worksheet": sheet_name,
-                                "has_data": True,
-                                "has_headers": True,
-                                "header_row": min_row,
-                                "total_rows": max_row - min_row + 1,
-                                "total_columns": max_col - min_col + 1,
-                                "data_rows": max_row - min_row,
-                                "sample_headers": table_headers[:5],
-                                "range": table_range,
-                                "description": f"Excel Table '{table_name}' in sheet '{sheet_name}' ({max_row - min_row} data rows)"
-                            }
-                            
-                            tables.append(table_info)
-                            
-                        except Exception as e:
-                            logger.warning(f"Error processing table {table_name}: {e}")
+                tables.extend(self._scan_sheet(sheet_name, excel_tables.get(sheet_name, [])))
             
             logger.info(f"Found {len(tables)} tables/worksheets in {self.current_file_info['name']}")
-            return tables
+            self._tables_cache[cache_key] = tables
+            self._store_cached_metadata(disk_cache_file, tables)
+            return list(tables)
             
         except Exception as e:
             logger.error(f"Error extracting tables from Excel file: {e}")
             return []
     
-    def _generate_table_description(self, sheet_name: str, has_data: bool, data_rows: int, total_cols: int, headers: List[str]) -> str:
-        """Generate a human-readable description of the table/worksheet"""
+    def _scan_sheet(self, sheet_name: str, excel_tables: List[Dict]) -> List[TableInfo]:
+        """Scan a single worksheet and return its info plus the given Excel Tables"""
+        from openpyxl.utils import range_boundaries
+        
+        sheet_tables = []
+        worksheet = self.current_workbook[sheet_name]
+        
+        # Get sheet dimensions
+        max_row, max_col = self._get_sheet_dimensions(worksheet)
+        
+        # Empty sheets skip header detection entirely
+        if max_row <= 0 or max_col <= 0:
+            return [self._empty_table_info(sheet_name)]
+        
+        # Try to detect if it looks like a table (has headers)
+        has_headers = False
+        header_row = None
+        headers = []
+        
+        if max_row > 1:
+            # Stream the first few rows once instead of calling worksheet.cell()
+            # per cell, which re-walks the row stream in read-only mode. The
+            # whole row is parsed anyway, so detection looks at every column
+            candidate_rows = list(itertools.islice(
+                worksheet.iter_rows(max_col=max_col, values_only=True), 3
+            ))
+            
+            for row_num, row in enumerate(candidate_rows, 1):
+                # If row has multiple non-empty values, consider it potential headers
+                if sum(value is not None for value in row) >= 2:
+                    has_headers = True
+                    header_row = row_num
+                    
+                    # Sample headers from the first non-empty column onwards
+                    first_col = next(index for index, value in enumerate(row) if value is not None)
+                    headers = [
+                        str(value) if value is not None else f"Column{col_num}"
+                        for col_num, value in enumerate(
+                            row[first_col:first_col + HEADER_SAMPLE_COLUMNS], first_col + 1
+                        )
+                    ]
+                    break
+        
+        # Calculate approximate data rows
+        data_rows = max(0, max_row - (header_row if header_row else 0))
+        
+        table_info = TableInfo(
+            name=sheet_name,
+            type="worksheet",
+            worksheet=None,
+            has_data=True,
+            has_headers=has_headers,
+            header_row=header_row,
+            total_rows=max_row,
+            total_columns=max_col,
+            data_rows=data_rows,
+            sample_headers=headers[:5],  # First 5 headers
+            range=None,
+            description=self._generate_table_description(sheet_name, True, data_rows, max_col, tuple(headers))
+        )
+        
+        sheet_tables.append(table_info)
+        
+        # Also add the Excel Table objects defined on this sheet
+        for excel_table in excel_tables:
+            table_name = excel_table["name"]
+            table_range = excel_table["ref"]
+            
+            # Parse table range to get dimensions
+            try:
+                min_col, min_row, max_col, max_row = range_boundaries(table_range)
+                
+                table_headers = []
+                if excel_table["has_style_info"]:
+                    # Try to get actual headers (non-empty values, converted in C via map/filter)
+                    header_values = next(worksheet.iter_rows(
+                        min_row=min_row, max_row=min_row,
+                        min_col=min_col, max_col=max_col,
+                        values_only=True
+                    ), ())
+                    table_headers = list(map(str, filter(None, header_values)))
+                
+                table_info = TableInfo(
+                    name=table_name,
+                    type="table",
+                    worksheet=sheet_name,
+                    has_data=True,
+                    has_headers=True,
+                    header_row=min_row,
+                    total_rows=max_row - min_row + 1,
+                    total_columns=max_col - min_col + 1,
+                    data_rows=max_row - min_row,
+                    sample_headers=table_headers[:5],
+                    range=table_range,
+                    description=f"Excel Table '{table_name}' in sheet '{sheet_name}' ({max_row - min_row} data rows)"
+                )
+                
+                sheet_tables.append(table_info)
+                
+            except Exception as e:
+                logger.warning(f"Error processing table {table_name}: {e}")
+        
+        return sheet_tables
+    
+    def _empty_table_info(self, sheet_name: str) -> TableInfo:
+        """Build the table info for a worksheet without any data"""
+        return TableInfo(
+            name=sheet_name,
+            type="worksheet",
+            worksheet=None,
+            has_data=False,
+            has_headers=False,
+            header_row=None,
+            total_rows=0,
+            total_columns=0,
+            data_rows=0,
+            sample_headers=[],
+            range=None,
+            description=self._generate_table_description(sheet_name, False, 0, 0, ())
+        )
+    
+    def _read_excel_tables(self) -> Dict[str, List[Dict]]:
+        """Read Excel Table definitions straight from the workbook package
+        
+        Read-only workbooks do not expose worksheet.tables, so the table parts
+        (xl/tables/tableN.xml) are located through the sheet relationships and
+        only their root attributes are parsed. Returns a mapping of sheet name
+        to the tables defined on that sheet.
+        """
+        excel_tables = {}
+        
+        try:
+            with zipfile.ZipFile(self._workbook_file) as package:
+                workbook_targets = self._read_relationship_targets(package, "xl/workbook.xml")
+                workbook_root = ET.fromstring(package.read("xl/workbook.xml"))
+                
+                for sheet in workbook_root.iter(f"{{{SPREADSHEET_NS}}}sheet"):
+                    sheet_path = workbook_targets.get(sheet.get(f"{{{RELATIONSHIP_NS}}}id"))
+                    if not sheet_path:
+                        continue
+                    
+                    sheet_excel_tables = []
+                    for table_path in self._read_relationship_targets(package, sheet_path, "/table").values():
+                        with package.open(table_path) as table_file:
+                            table_root = ET.parse(table_file).getroot()
+                        
+                        sheet_excel_tables.append({
+                            "name": table_root.get("name") or table_root.get("displayName"),
+                            "ref": table_root.get("ref"),
+                            "has_style_info": table_root.find(f"{{{SPREADSHEET_NS}}}tableStyleInfo") is not None
+                        })
+                    
+                    if sheet_excel_tables:
+                        excel_tables[sheet.get("name")] = sheet_excel_tables
+        
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            logger.warning(f"Could not read Excel Table definitions: {e}")
+        
+        return excel_tables
+    
+    def _read_relationship_targets(self, package: zipfile.ZipFile, part_path: str, type_suffix: str = "") -> Dict[str, str]:
+        """Map relationship ids of a package part to the paths of their targets"""
+        part_dir, part_name = posixpath.split(part_path)
+        rels_path = posixpath.join(part_dir, "_rels", f"{part_name}.rels")
+        if rels_path not in package.NameToInfo:
+            return {}
+        
+        targets = {}
+        rels_root = ET.fromstring(package.read(rels_path))
+        for relationship in rels_root.iter(f"{{{PACKAGE_RELATIONSHIP_NS}}}Relationship"):
+            if not relationship.get("Type", "").endswith(type_suffix):
+                continue
+            
+            target = relationship.get("Target", "")
+            if target.startswith("/"):
+                target_path = target.lstrip("/")
+            else:
+                target_path = posixpath.normpath(posixpath.join(part_dir, target))
+            targets[relationship.get("Id")] = target_path
+        
+        return targets
+    
+    def _get_sheet_dimensions(self, worksheet) -> Tuple[int, int]:
+        """Get (max_row, max_column) from the sheet's stored dimension record"""
+        from openpyxl.utils import range_boundaries
+        
+        try:
+            # Uses the <dimension> element written by Excel without reading any rows
+            dimension = worksheet.calculate_dimension(force=False)
+        except ValueError:
+            # Sheet is unsized, so the rows have to be scanned to find its extent
+            try:
+                dimension = worksheet.calculate_dimension(force=True)
+            except Exception:
+                # openpyxl fails on an unsized sheet without any cells
+                return 0, 0
+        
+        _, _, max_col, max_row = range_boundaries(dimension)
+        return max_row, max_col
+    
+    def _tables_cache_key(self) -> tuple:
+        """Build the cache key for the current file from its path, mtime and size"""
+        return (self.current_file_path,) + self._file_stat
+    
+    async def get_cached_tables(self, file_info: Dict) -> Optional[List[TableInfo]]:
+        """Get table metadata stored for the current version of a SharePoint file, without downloading it"""
+        # The listing may be out of date, so look up the version SharePoint
+        # reports now rather than trusting the listed eTag
+        etag = await self._current_etag(file_info)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._load_cached_metadata, self._metadata_cache_file(file_info, etag)
+        )
+    
+    def _metadata_cache_file(self, file_info: Dict, etag: Optional[str]) -> Optional[Path]:
+        """Get the sidecar cache file for a SharePoint file version, or None if the version is unknown"""
+        file_id = file_info.get('id')
+        if not file_id or not etag:
+            return None
+        
+        try:
+            cache_dir = private_cache_dir(METADATA_CACHE_NAME)
+        except OSError as e:
+            logger.warning(f"Table metadata cache disabled: {e}")
+            return None
+        
+        digest = hashlib.sha1(f"{file_id}:{etag}:{file_info.get('name', '')}".encode('utf-8')).hexdigest()
+        return cache_dir / f"{digest}.json"
+    
+    def _load_cached_metadata(self, cache_file: Optional[Path]) -> Optional[List[TableInfo]]:
+        """Load table metadata from the sidecar cache if present"""
+        if cache_file is None:
+            return None
+        
+        # The cache file is keyed on a verified file version, so it never goes stale
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return [TableInfo.from_dict(data) for data in json.load(f)]
+        except (OSError, ValueError, TypeError):
+            return None
+    
+    def _store_cached_metadata(self, cache_file: Optional[Path], tables: List[TableInfo]) -> None:
+        """Persist table metadata to the sidecar cache"""
+        if cache_file is None:
+            return
+        
+        try:
+            data = json.dumps([table.to_dict() for table in tables], ensure_ascii=False)
+            write_private_file(cache_file, data.encode('utf-8'))
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not write table metadata cache: {e}")
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _generate_table_description(sheet_name: str, has_data: bool, data_rows: int, total_cols: int, headers: Tuple[str, ...]) -> str:
+        """Generate a human-readable description of the table/worksheet (memoized)"""
         if not has_data:
             return f"Empty worksheet '{sheet_name}'"
         
@@ -2,16 +2,120 @@
 GUI implementation using Toga for SharePoint Excel Manager
 """
 import asyncio
+import collections
+import functools
+import itertools
+import logging
+import re
+import shutil
+import subprocess
 import sys
-import threading
 import webbrowser
+from datetime import datetime
 
 import toga
 from toga.style.pack import COLUMN, ROW, Pack
 
-from .excel_manager import ExcelManager
 from .settings import SettingsManager
-from .sharepoint_client import SharePointClient
+
+logger = logging.getLogger(__name__)
+
+# Delay (seconds) used to coalesce console writes into a single widget update
+CONSOLE_FLUSH_DELAY = 0.05
+
+# Console scrollback limits (entries kept, and characters rendered)
+MAX_CONSOLE_LINES = 2000
+MAX_CONSOLE_CHARS = 200_000
+
+# Delay (seconds) used to coalesce status label changes into a single repaint
+STATUS_FLUSH_DELAY = 0.05
+
+# Frames and interval (seconds) of the status spinner shown during long operations
+SPINNER_FRAMES = ("|", "/", "-", "\\")
+SPINNER_INTERVAL = 0.25
+
+# Delay (seconds) after the last keystroke before input changes are stored
+SETTINGS_DEBOUNCE_DELAY = 0.25
+
+# File extensions shown as Excel files when browsing
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+# Byte thresholds used when formatting file sizes
+KB = 1 << 10
+MB = 1 << 20
+
+# Azure AD sign-in error codes with a user-facing explanation
+AADSTS_CODE_PATTERN = re.compile(r"AADSTS\d+")
+AADSTS_MESSAGES = {
+    "AADSTS53003": "Connection blocked by Conditional Access - try Device Auth",
+    "AADSTS50058": "Silent sign-in failed - try Device Auth",
+}
+
+# Styles shared by several widgets (Toga copies a style when it is assigned)
+FIELD_LABEL_STYLE = Pack(margin=(0, 0, 5, 0))
+INPUT_STYLE = Pack(width=400, margin=(0, 0, 10, 0))
+BUTTON_STYLE = Pack(margin=(0, 10, 0, 0), width=120)
+WIDE_BUTTON_STYLE = Pack(margin=(0, 10, 0, 0), width=140)
+
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_iso_date(date_str):
+    """Format an ISO 8601 timestamp for display (memoized, listings repeat dates)"""
+    dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    return dt.strftime('%Y-%m-%d %H:%M')
+
+
+@functools.lru_cache(maxsize=1)
+def _format_settings_info(team_url, document_folder, window_width, window_height,
+                          auto_connect, remember_credentials, theme, config_file):
+    """Format the settings summary (memoized on the setting values it shows)"""
+    return f"""Current Settings:
+        
+Team URL: {team_url or 'Not set'}
+Document Folder: {document_folder or 'Not set'}
+Window Size: {window_width}x{window_height}
+Auto Connect: {'Yes' if auto_connect else 'No'}
+Remember Credentials: {'Yes' if remember_credentials else 'No'}
+Theme: {theme}
+
+Settings are automatically saved when changed.
+Configuration file location: {config_file}"""
+
+
+def _detect_clipboard():
+    """Pick a clipboard copy function for this platform, or None if unavailable"""
+    try:
+        # Prefer pyperclip if available
+        import pyperclip
+        return pyperclip.copy
+    except ImportError:
+        pass
+    
+    if sys.platform == 'win32':
+        command = ['clip']
+    elif sys.platform == 'darwin':
+        command = ['pbcopy']
+    else:
+        command = ['xclip', '-selection', 'clipboard']
+    
+    if shutil.which(command[0]) is None:
+        return None
+    return lambda text: subprocess.run(command, input=text.encode(), check=True)
+
+
+class ConsoleLogHandler(logging.Handler):
+    """Logging handler that queues each record for the console text area"""
+    
+    def __init__(self, append_console, level=logging.WARNING):
+        super().__init__(level)
+        self.append_console = append_console
+    
+    def emit(self, record):
+        try:
+            self.append_console(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
 
 
 class SharePointExcelApp(toga.App):
@@ -27,9 +131,38 @@ class SharePointExcelApp(toga.App):
         )
     
     def print_to_console(self, message):
-        """Add message to console text area and auto-scroll to bottom"""
-        current_text = self.console_text.value
-        self.console_text.value = current_text + message + "\n"
+        """Queue a message for the console text area"""
+        self._append_console(message + "\n")
+    
+    def _append_console(self, text):
+        """Buffer console text and schedule a batched widget update"""
+        self._console_buffer.append(text)
+        self._schedule_console_flush()
+    
+    def _schedule_console_flush(self):
+        """Schedule a single console flush for everything buffered so far"""
+        # Libraries may still log from worker threads after the app has exited
+        if self._console_flush_scheduled or self.loop.is_closed():
+            return
+        self._console_flush_scheduled = True
+        # Writes can come from worker threads, so hop onto the event loop first
+        self.loop.call_soon_threadsafe(self.loop.call_later, CONSOLE_FLUSH_DELAY, self._flush_console)
+    
+    def _flush_console(self):
+        """Write all buffered console text to the widget and auto-scroll to bottom"""
+        self._console_flush_scheduled = False
+        
+        if not self._console_buffer:
+            return
+        while self._console_buffer:
+            self._console_lines.append(self._console_buffer.popleft())
+        
+        # Render from the bounded scrollback instead of reading the widget back,
+        # dropping the oldest entries while the text is over budget
+        text = "".join(self._console_lines)
+        while len(text) > MAX_CONSOLE_CHARS and len(self._console_lines) > 1:
+            text = text[len(self._console_lines.popleft()):]
+        self.console_text.value = text
         
         # Auto-scroll to bottom
         try:
@@ -45,12 +178,58 @@ class SharePointExcelApp(toga.App):
             # If scrolling fails, just continue without it
             pass
     
+    @property
+    def sharepoint_client(self):
+        """SharePoint client, constructed the first time it is needed"""
+        if self._sharepoint_client is None:
+            # Imported here so importing the GUI module does not load msal/requests
+            from .sharepoint_client import SharePointClient
+            
+            # Sign-in tokens are only kept on disk if the user opted in
+            token_cache_file = None
+            if self.settings_manager.get("remember_credentials"):
+                token_cache_file = self.settings_manager.config_file.with_name("token_cache.json")
+            self._sharepoint_client = SharePointClient(token_cache_file)
+        return self._sharepoint_client
+    
     def startup(self):
         """Initialize the application"""
-        self.sharepoint_client = SharePointClient()
+        # Console output is buffered and written to the widget in batches
+        self._console_buffer = collections.deque()
+        self._console_lines = collections.deque(maxlen=MAX_CONSOLE_LINES)
+        self._console_flush_scheduled = False
+        self._console_log_handler = None
+        
+        # Setting writes from the text inputs are debounced per key
+        self._pending_settings = {}
+        self._settings_debounce_handles = {}
+        
+        # Window geometry last written to settings, as (width, height, x, y)
+        self._last_saved_window = None
+        
+        # Held while a connection test or device sign-in is running
+        self._connection_lock = asyncio.Lock()
+        
+        # Listing fetch of the most recent Browse Files click
+        self._browse_task = None
+        
+        # Background folder listing started after a successful connection
+        self._prefetch_task = None
+        self._prefetch_key = None
+        
+        # Excel file selection window, created on first use
+        self.selection_window = None
+        
+        # Resolve the clipboard backend once instead of probing on every copy
+        self._clipboard_copy = _detect_clipboard()
+        
+        # SharePoint client, created on first use so MSAL setup does not
+        # delay the first paint of the main window
+        self._sharepoint_client = None
         
         # Initialize settings manager
         self.settings_manager = SettingsManager()
+        settings = self.settings_manager.settings
         
         # Main container
         main_box = toga.Box(style=Pack(direction=COLUMN, margin=20))
@@ -62,72 +241,45 @@ class SharePointExcelApp(toga.App):
         )
         
         # Team URL input
-        url_label = toga.Label("Team SharePoint URL:", style=Pack(margin=(0, 0, 5, 0)))
+        url_label = toga.Label("Team SharePoint URL:", style=FIELD_LABEL_STYLE)
         self.url_input = toga.TextInput(
-            value=self.settings_manager.get("team_url", ""),
-            style=Pack(width=400, margin=(0, 0, 10, 0)),
+            value=settings.team_url,
+            style=INPUT_STYLE,
             on_change=self.on_url_change
         )
         
         # Document folder input
-        folder_label = toga.Label("Document Folder Path:", style=Pack(margin=(0, 0, 5, 0)))
+        folder_label = toga.Label("Document Folder Path:", style=FIELD_LABEL_STYLE)
         self.folder_input = toga.TextInput(
-            value=self.settings_manager.get("document_folder", ""),
-            style=Pack(width=400, margin=(0, 0, 10, 0)),
+            value=settings.document_folder,
+            style=INPUT_STYLE,
             on_change=self.on_folder_change
         )
         
         # Buttons container
         button_box = toga.Box(style=Pack(direction=ROW, margin=(20, 0, 0, 0)))
         
-        # Test connection button
-        test_button = toga.Button(
-            "Test Connection",
-            on_press=self.test_connection,
-            style=Pack(margin=(0, 10, 0, 0), width=120)
-        )
-        
-        # Save config button
-        save_button = toga.Button(
-            "Save Config",
-            on_press=self.save_config,
-            style=Pack(margin=(0, 10, 0, 0), width=120)
-        )
-        
-        # Browse files button
-        browse_button = toga.Button(
-            "Browse Files",
-            on_press=self.browse_files,
-            style=Pack(margin=(0, 10, 0, 0), width=120)
-        )
-        
-        # Settings button
-        settings_button = toga.Button(
-            "Settings",
-            on_press=self.show_settings,
-            style=Pack(margin=(0, 10, 0, 0), width=120)
-        )
-        
-        # Device auth button (alternative for strict environments)
-        # Note: Device auth may hang - only use if Test Connection fails
-        device_auth_button = toga.Button(
-            "Device Auth (if needed)",
-            on_press=self.device_auth_connection,
-            style=Pack(margin=(0, 10, 0, 0), width=140)
-        )
-        
-        # Clear console button
-        clear_button = toga.Button(
-            "Clear Console",
-            on_press=self.clear_console,
-            style=Pack(margin=(0, 10, 0, 0), width=120)
-        )
+        # Action buttons, in display order. Device auth is the alternative for
+        # strict environments and may hang - only use if Test Connection fails
+        button_box.add(*(
+            toga.Button(label, on_press=handler, style=style)
+            for label, handler, style in (
+                ("Test Connection", self.test_connection, BUTTON_STYLE),
+                ("Save Config", self.save_config, BUTTON_STYLE),
+                ("Browse Files", self.browse_files, BUTTON_STYLE),
+                ("Settings", self.show_settings, BUTTON_STYLE),
+                ("Device Auth (if needed)", self.device_auth_connection, WIDE_BUTTON_STYLE),
+                ("Clear Console", self.clear_console, BUTTON_STYLE),
+            )
+        ))
         
         # Status label
         self.status_label = toga.Label(
             "Ready",
             style=Pack(margin=(20, 0, 0, 0), color="green")
         )
+        self._last_status = self._pending_status = ("Ready", "green")
+        self._status_flush_handle = None
         
         # Files text area
         files_label = toga.Label("Files:", style=Pack(margin=(20, 0, 5, 0)))
@@ -137,151 +289,220 @@ class SharePointExcelApp(toga.App):
         )
         
         # Console text area
-        console_label = toga.Label("Console Output:", style=Pack(margin=(0, 0, 5, 0)))
+        console_label = toga.Label("Console Output:", style=FIELD_LABEL_STYLE)
         self.console_text = toga.MultilineTextInput(
             readonly=False,  # Allow editing so URLs can be clicked/selected
             style=Pack(height=150, margin=(0, 0, 0, 0))
         )
         
-        # Add components to containers
-        button_box.add(test_button)
-        button_box.add(save_button)
-        button_box.add(browse_button)
-        button_box.add(settings_button)
-        button_box.add(device_auth_button)
-        button_box.add(clear_button)
-        
-        main_box.add(title)
-        main_box.add(url_label)
-        main_box.add(self.url_input)
-        main_box.add(folder_label)
-        main_box.add(self.folder_input)
-        main_box.add(button_box)
-        main_box.add(self.status_label)
-        main_box.add(files_label)
-        main_box.add(self.files_text)
-        main_box.add(console_label)
-        main_box.add(self.console_text)
+        # Add components to the main container in one call
+        main_box.add(
+            title,
+            url_label,
+            self.url_input,
+            folder_label,
+            self.folder_input,
+            button_box,
+            self.status_label,
+            files_label,
+            self.files_text,
+            console_label,
+            self.console_text
+        )
         
         # Create main window
         self.main_window = toga.MainWindow(title=self.formal_name)
         self.main_window.content = main_box
-        self.main_window.show()
         
-        # Load window size and position from settings
+        # Load window size and position from settings before the first paint,
+        # so the window is not shown and then resized
         self._restore_window_state()
+        self.main_window.show()
         
-        # Redirect print statements to console
-        self._redirect_console()
+        # Route log records to the console (stdout and stderr stay untouched)
+        self._attach_console_logging()
         
-        # Welcome message
-        self.print_to_console("SharePoint Excel Manager started")
-        self.print_to_console("Use 'Test Connection' for most authentication scenarios")
-        self.print_to_console("'Device Auth' is available but may hang - only use if Test Connection fails")
+        # Welcome message, written once the window is up
+        self.loop.call_soon(self._show_welcome_message)
     
-    def _redirect_console(self):
-        """Redirect print statements to the console text area"""
-        original_stdout = sys.stdout
-        original_stderr = sys.stderr
-        
-        class ConsoleRedirect:
-            def __init__(self, text_widget, original_stream):
-                self.text_widget = text_widget
-                self.original_stream = original_stream
-            
-            def write(self, text):
-                if text.strip():
-                    current_text = self.text_widget.value
-                    self.text_widget.value = current_text + text
-                self.original_stream.write(text)
-            
-            def flush(self):
-                self.original_stream.flush()
-        
-        sys.stdout = ConsoleRedirect(self.console_text, original_stdout)
-        sys.stderr = ConsoleRedirect(self.console_text, original_stderr)
+    def _show_welcome_message(self):
+        """Write the startup hints to the console as a single entry"""
+        self.print_to_console("\n".join([
+            "SharePoint Excel Manager started",
+            "Use 'Test Connection' for most authentication scenarios",
+            "'Device Auth' is available but may hang - only use if Test Connection fails",
+        ]))
+    
+    def _attach_console_logging(self):
+        """Show warnings and errors logged by the app and its libraries in the console"""
+        root_logger = logging.getLogger()
+        if not root_logger.handlers:
+            # Keep the terminal output logging would otherwise fall back to
+            root_logger.addHandler(logging.StreamHandler())
+        self._console_log_handler = ConsoleLogHandler(self._append_console)
+        root_logger.addHandler(self._console_log_handler)
     
     def copy_to_clipboard(self, text):
         """Copy text to clipboard - platform independent"""
+        if self._clipboard_copy is None:
+            return False
         try:
-            # Try using pyperclip if available
-            import pyperclip
-            pyperclip.copy(text)
+            self._clipboard_copy(text)
             return True
-        except ImportError:
-            try:
-                # Fallback for Windows
-                import subprocess
-                subprocess.run(['clip'], input=text.encode(), check=True)
-                return True
-            except:
-                try:
-                    # Fallback for macOS
-                    subprocess.run(['pbcopy'], input=text.encode(), check=True)
-                    return True
-                except:
-                    try:
-                        # Fallback for Linux
-                        subprocess.run(['xclip', '-selection', 'clipboard'], input=text.encode(), check=True)
-                        return True
-                    except:
-                        return False
+        except Exception:
+            return False
+    
+    def _set_status(self, text, color):
+        """Queue a status label update; rapid changes are coalesced into one repaint"""
+        self._pending_status = (text, color)
+        if self._status_flush_handle is None:
+            self._status_flush_handle = self.loop.call_later(STATUS_FLUSH_DELAY, self._apply_status)
+    
+    async def _spin_status(self, text):
+        """Animate the status label until cancelled, so slow work visibly progresses"""
+        for frame in itertools.cycle(SPINNER_FRAMES):
+            self._set_status(f"{text} {frame}", "orange")
+            await asyncio.sleep(SPINNER_INTERVAL)
+    
+    def _apply_status(self):
+        """Apply the latest queued status, skipping it if nothing changed"""
+        self._status_flush_handle = None
+        if self._pending_status == self._last_status:
+            return
+        last_text, last_color = self._last_status
+        self._last_status = text, color = self._pending_status
+        # Spinner frames and progress messages usually keep the colour, and
+        # a style write re-applies the label's style, so only write changes
+        if text != last_text:
+            self.status_label.text = text
+        if color != last_color:
+            self.status_label.style.color = color
     
     def clear_console(self, widget):
         """Clear the console text area"""
+        self._console_buffer.clear()
+        self._console_lines.clear()
         self.console_text.value = ""
         self.print_to_console("Console cleared")
     
     def _restore_window_state(self):
         """Restore window size and position from settings"""
         settings = self.settings_manager.settings
+        width, height = settings.window_width, settings.window_height
+        x, y = settings.window_x, settings.window_y
+        
+        # Remember what is on disk so an unchanged window is not written back
+        self._last_saved_window = (width, height, x, y)
         
-        # Set window size
-        if settings.window_width and settings.window_height:
+        # Set window size (skipping the native call if it already matches)
+        if width and height:
             try:
-                self.main_window.size = (settings.window_width, max(settings.window_height, 700))
+                size = (width, max(height, 700))
+                if tuple(self.main_window.size) != size:
+                    self.main_window.size = size
             except Exception:
                 pass  # Ignore if setting size fails
         
         # Set window position (if available and valid)
-        if settings.window_x is not None and settings.window_y is not None:
+        if x is not None and y is not None:
             try:
-                self.main_window.position = (settings.window_x, settings.window_y)
+                position = (x, y)
+                if tuple(self.main_window.position) != position:
+                    self.main_window.position = position
             except Exception:
                 pass  # Ignore if setting position fails
     
     def _save_window_state(self):
-        """Save current window state to settings"""
+        """Save current window state to settings if it changed"""
         try:
-            size = self.main_window.size
-            position = self.main_window.position
-            
-            self.settings_manager.update(
-                window_width=size[0],
-                window_height=size[1],
-                window_x=position[0],
-                window_y=position[1]
-            )
+            window_state = tuple(self.main_window.size) + tuple(self.main_window.position)
         except Exception:
-            pass  # Ignore if getting window state fails
+            return  # Ignore if getting window state fails
+        
+        if window_state == self._last_saved_window:
+            return
+        
+        self.settings_manager.update(
+            window_width=window_state[0],
+            window_height=window_state[1],
+            window_x=window_state[2],
+            window_y=window_state[3]
+        )
+        self._last_saved_window = window_state
     
     def on_exit(self):
         """Called when the application is closing"""
+        # Apply input changes that are still waiting on the debounce timer
+        self._flush_pending_settings()
+        
         # Save window state
         self._save_window_state()
         
         # Save current settings
         self.settings_manager.save()
         
+        # Closing the client also ends a pending device code sign-in, whose
+        # worker thread would otherwise keep the process alive
+        self._cancel_listing_prefetch()
+        if self._sharepoint_client is not None:
+            self._sharepoint_client.close()
+        
+        # Stop routing log records to the console once the window is gone
+        if self._console_log_handler is not None:
+            logging.getLogger().removeHandler(self._console_log_handler)
+        
         return True
     
     def on_url_change(self, widget):
         """Handle URL input changes"""
-        self.settings_manager.set("team_url", widget.value.strip())
+        self._debounce_setting("team_url", widget.value.strip())
     
     def on_folder_change(self, widget):
         """Handle folder input changes"""
-        self.settings_manager.set("document_folder", widget.value.strip())
+        self._debounce_setting("document_folder", widget.value.strip())
+    
+    def _debounce_setting(self, key, value):
+        """Store a setting once typing pauses, instead of on every keystroke"""
+        # Change events also fire for programmatic assignments, including the
+        # initial values; nothing to do if the stored value already matches
+        if key not in self._pending_settings and value == self.settings_manager.get(key):
+            return
+        self._pending_settings[key] = value
+        
+        handle = self._settings_debounce_handles.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        self._settings_debounce_handles[key] = self.loop.call_later(
+            SETTINGS_DEBOUNCE_DELAY, self._apply_pending_setting, key
+        )
+    
+    def _apply_pending_setting(self, key):
+        """Write a debounced setting value to the settings manager"""
+        self._settings_debounce_handles.pop(key, None)
+        if key in self._pending_settings:
+            self.settings_manager.set(key, self._pending_settings.pop(key))
+            # A listing fetched for the old URL or folder is no longer useful
+            if (self.settings_manager.get("team_url", ""),
+                    self.settings_manager.get("document_folder", "")) != self._prefetch_key:
+                self._cancel_listing_prefetch()
+    
+    def _flush_pending_settings(self):
+        """Apply any debounced setting values immediately"""
+        for key in list(self._pending_settings):
+            handle = self._settings_debounce_handles.pop(key, None)
+            if handle is not None:
+                handle.cancel()
+            self._apply_pending_setting(key)
+    
+    def _connection_inputs(self):
+        """Return the stripped team URL and folder path from settings"""
+        # The input handlers already store stripped values; apply any that
+        # are still waiting on the debounce timer before reading them back
+        self._flush_pending_settings()
+        return (
+            self.settings_manager.get("team_url", ""),
+            self.settings_manager.get("document_folder", "")
+        )
     
     async def show_settings(self, widget):
         """Show settings dialog"""
@@ -289,45 +510,49 @@ class SharePointExcelApp(toga.App):
         
         # Create a simple info dialog for now
         # In a full implementation, this could be a proper settings window
-        info_text = f"""Current Settings:
-        
-Team URL: {settings.team_url or 'Not set'}
-Document Folder: {settings.document_folder or 'Not set'}
-Window Size: {settings.window_width}x{settings.window_height}
-Auto Connect: {'Yes' if settings.auto_connect else 'No'}
-Remember Credentials: {'Yes' if settings.remember_credentials else 'No'}
-Theme: {settings.theme}
-
-Settings are automatically saved when changed.
-Configuration file location: {self.settings_manager._config_file}"""
+        info_text = _format_settings_info(
+            settings.team_url,
+            settings.document_folder,
+            settings.window_width,
+            settings.window_height,
+            settings.auto_connect,
+            settings.remember_credentials,
+            settings.theme,
+            self.settings_manager.config_file
+        )
         
         await self.main_window.dialog(toga.InfoDialog("Settings", info_text))
     
     async def device_auth_connection(self, widget):
         """Test connection using device code authentication (for strict environments)"""
-        team_url = self.url_input.value.strip()
-        folder_path = self.folder_input.value.strip()
-        
-        if not team_url:
-            self.status_label.text = "Please enter a team URL"
-            self.status_label.style.color = "red"
+        # Ignore repeat clicks while a connection attempt is already running
+        if self._connection_lock.locked():
             return
         
-        self.status_label.text = "Preparing device authentication..."
-        self.status_label.style.color = "orange"
-        
-        try:
-            # Get device code and URL immediately
-            flow = self.sharepoint_client.app.initiate_device_flow(scopes=self.sharepoint_client.scope)
+        async with self._connection_lock:
+            team_url, folder_path = self._connection_inputs()
             
-            if "user_code" not in flow:
-                raise Exception("Failed to create device flow")
+            if not team_url:
+                self._set_status("Please enter a team URL", "red")
+                return
             
-            verification_uri = flow.get("verification_uri", "")
-            user_code = flow.get("user_code", "")
+            self._set_status("Preparing device authentication...", "orange")
             
-            # Show dialog with code and instructions
-            dialog_message = f"""Device Authentication Setup:
+            try:
+                # Get device code and URL (network call, so run it off the event loop)
+                flow = await self.loop.run_in_executor(
+                    None,
+                    lambda: self.sharepoint_client.app.initiate_device_flow(scopes=self.sharepoint_client.scope)
+                )
+                
+                if "user_code" not in flow:
+                    raise Exception("Failed to create device flow")
+                
+                verification_uri = flow.get("verification_uri", "")
+                user_code = flow.get("user_code", "")
+                
+                # Show dialog with code and instructions
+                dialog_message = f"""Device Authentication Setup:
 
 URL: {verification_uri}
 Code: {user_code}
@@ -340,188 +565,198 @@ When you click OK:
 
 The application will wait for you to complete the process.
 This may take a few moments after you authenticate."""
-            
-            await self.main_window.dialog(toga.InfoDialog("Device Code Authentication", dialog_message))
-            
-            # Copy code to clipboard
-            if self.copy_to_clipboard(user_code):
-                self.print_to_console(f"Device code copied to clipboard: {user_code}")
-            else:
-                self.print_to_console(f"Could not copy to clipboard. Code: {user_code}")
-            
-            # Open browser
-            def open_browser():
-                try:
-                    webbrowser.open(verification_uri)
-                    self.print_to_console(f"Browser opened to: {verification_uri}")
-                except Exception as e:
-                    self.print_to_console(f"Could not open browser: {e}")
-            
-            threading.Thread(target=open_browser, daemon=True).start()
-            
-            self.status_label.text = "Complete authentication in browser - app will freeze temporarily"
-            self.status_label.style.color = "orange"
-            
-            # Use regular print for debugging (will appear in terminal)
-            print("DEBUG: Starting device authentication flow...")
-            
-            # Complete device flow (this will block)
-            try:
-                print("DEBUG: About to call acquire_token_by_device_flow...")
-                print("DEBUG: If this hangs for more than 2 minutes after you complete browser auth,")
-                print("DEBUG: close this app and restart it, then try 'Test Connection' instead.")
                 
-                result = self.sharepoint_client.app.acquire_token_by_device_flow(flow)
-                print("DEBUG: acquire_token_by_device_flow returned")
-                print(f"DEBUG: Result: {result}")
+                # Connect to Graph while the user reads the dialog and signs in, so
+                # the connection test afterwards skips the DNS lookup and handshake
+                self.loop.run_in_executor(None, self.sharepoint_client.warm_up_connection)
                 
-            except Exception as flow_error:
-                print(f"DEBUG: Exception caught: {flow_error}")
-                self.status_label.text = f"Device flow error: {str(flow_error)[:50]}..."
-                self.status_label.style.color = "red"
-                return
-            
-            print("DEBUG: Checking result...")
-            if result and "access_token" in result:
-                self.sharepoint_client.access_token = result["access_token"]
-                self.sharepoint_client.authenticated = True
+                await self.main_window.dialog(toga.InfoDialog("Device Code Authentication", dialog_message))
+                
+                # Copy code to clipboard (clipboard tools are subprocesses, so use a worker thread)
+                if await self.loop.run_in_executor(None, self.copy_to_clipboard, user_code):
+                    self.print_to_console(f"Device code copied to clipboard: {user_code}")
+                else:
+                    self.print_to_console(f"Could not copy to clipboard. Code: {user_code}")
+                
+                # Open browser
+                def open_browser():
+                    try:
+                        webbrowser.open(verification_uri)
+                        self.print_to_console(f"Browser opened to: {verification_uri}")
+                    except Exception as e:
+                        self.print_to_console(f"Could not open browser: {e}")
+                
+                self.loop.run_in_executor(None, open_browser)
+                
+                self._set_status("Complete authentication in browser - waiting for sign-in...", "orange")
+                
+                logger.debug("Starting device authentication flow...")
                 
-                # Test the connection after authentication
-                connection_success = await self.sharepoint_client.test_connection(team_url, folder_path)
-                if connection_success:
-                    self.status_label.text = "Device authentication and connection successful!"
-                    self.status_label.style.color = "green"
-                    self.print_to_console("Device authentication successful!")
+                # Complete device flow in a worker thread; MSAL polls until the user
+                # signs in, and the UI stays responsive meanwhile
+                try:
+                    logger.debug("Calling acquire_token_by_device_flow...")
                     
-                    # Auto-save successful connection settings
-                    self.settings_manager.update(
-                        team_url=team_url,
-                        document_folder=folder_path
+                    result = await self.loop.run_in_executor(
+                        None, self.sharepoint_client.wait_for_device_flow, flow
                     )
-                else:
-                    self.status_label.text = "Authentication succeeded but connection test failed"
-                    self.status_label.style.color = "orange"
-                    self.print_to_console("Authentication succeeded but connection test failed")
-            else:
-                error_msg = result.get("error_description", "Authentication failed")
-                self.status_label.text = "Device authentication failed"
-                self.status_label.style.color = "red"
-                self.print_to_console(f"Device authentication failed: {error_msg}")
+                    # Only log the result keys; the result itself carries the tokens
+                    logger.debug("acquire_token_by_device_flow returned keys: %s", list(result or ()))
+                    
+                except Exception as flow_error:
+                    logger.debug("Device flow raised: %s", flow_error)
+                    self._set_status(f"Device flow error: {str(flow_error)[:50]}...", "red")
+                    return
                 
-        except Exception as e:
-            self.status_label.text = f"Device auth error: {str(e)[:50]}..."
-            self.status_label.style.color = "red"
-            self.print_to_console(f"Device authentication error: {str(e)}")
+                if result and "access_token" in result:
+                    self.sharepoint_client.access_token = result["access_token"]
+                    self.sharepoint_client.authenticated = True
+                    await self.loop.run_in_executor(None, self.sharepoint_client.save_token_cache)
+                    
+                    # Test the connection after authentication
+                    connection_success = await self.sharepoint_client.test_connection(team_url, folder_path)
+                    if connection_success:
+                        self._set_status("Device authentication and connection successful!", "green")
+                        self.print_to_console("Device authentication successful!")
+                        
+                        # Auto-save successful connection settings
+                        self.settings_manager.update(
+                            team_url=team_url,
+                            document_folder=folder_path
+                        )
+                        self._start_listing_prefetch(team_url, folder_path)
+                    else:
+                        self._set_status("Authentication succeeded but connection test failed", "orange")
+                        self.print_to_console("Authentication succeeded but connection test failed")
+                else:
+                    error_msg = result.get("error_description", "Authentication failed")
+                    self._set_status("Device authentication failed", "red")
+                    self.print_to_console(f"Device authentication failed: {error_msg}")
+                    
+            except Exception as e:
+                self._set_status(f"Device auth error: {str(e)[:50]}...", "red")
+                self.print_to_console(f"Device authentication error: {str(e)}")
     
     async def save_config(self, widget):
         """Save current configuration"""
-        team_url = self.url_input.value.strip()
-        document_folder = self.folder_input.value.strip()
+        # Applies any debounced input changes, so settings hold the current
+        # URL and folder and only need writing out
+        self._connection_inputs()
         
         try:
-            # Update settings
-            self.settings_manager.update(
-                team_url=team_url,
-                document_folder=document_folder
-            )
-            
-            # Save to file
-            if self.settings_manager.save():
-                self.status_label.text = "Configuration saved successfully"
-                self.status_label.style.color = "green"
+            # Save to file in a worker thread; the config directory may be on
+            # a slow network share
+            if await self.loop.run_in_executor(None, self.settings_manager.save):
+                self._set_status("Configuration saved successfully", "green")
                 self.print_to_console("Configuration saved successfully")
             else:
-                self.status_label.text = "Error saving configuration"
-                self.status_label.style.color = "red"
+                self._set_status("Error saving configuration", "red")
                 self.print_to_console("Error saving configuration")
                 
         except Exception as e:
-            self.status_label.text = f"Error saving config: {str(e)}"
-            self.status_label.style.color = "red"
+            self._set_status(f"Error saving config: {str(e)}", "red")
             self.print_to_console(f"Error saving config: {str(e)}")
     
     async def test_connection(self, widget):
         """Test connection to SharePoint"""
-        team_url = self.url_input.value.strip()
-        folder_path = self.folder_input.value.strip()
-        
-        if not team_url:
-            self.status_label.text = "Please enter a team URL"
-            self.status_label.style.color = "red"
+        # Ignore repeat clicks while a connection attempt is already running
+        if self._connection_lock.locked():
             return
         
-        self.status_label.text = "Testing connection - authentication may open browser..."
-        self.status_label.style.color = "orange"
-        self.print_to_console(f"Testing connection to: {team_url}")
-        
-        try:
-            success = await self.sharepoint_client.test_connection(team_url, folder_path)
-            if success:
-                self.status_label.text = "Connection successful!"
-                self.status_label.style.color = "green"
-                self.print_to_console("Connection successful!")
-                
-                # Auto-save successful connection settings
-                self.settings_manager.update(
-                    team_url=team_url,
-                    document_folder=folder_path
+        async with self._connection_lock:
+            team_url, folder_path = self._connection_inputs()
+            
+            if not team_url:
+                self._set_status("Please enter a team URL", "red")
+                return
+            
+            self.print_to_console(f"Testing connection to: {team_url}")
+            
+            spinner = asyncio.ensure_future(
+                self._spin_status("Testing connection - authentication may open browser...")
+            )
+            try:
+                # A fallback to device code sign-in shows its code in the console
+                success = await self.sharepoint_client.test_connection(
+                    team_url, folder_path, show_device_code=self.print_to_console
                 )
-            else:
-                self.status_label.text = "Connection failed - check URL and try again"
-                self.status_label.style.color = "red"
-                self.print_to_console("Connection failed - check URL and try again")
-        except Exception as e:
-            error_msg = str(e)
-            if "AADSTS53003" in error_msg:
-                self.status_label.text = "Connection blocked by Conditional Access - try Device Auth"
-                self.print_to_console("Connection blocked by Conditional Access - try Device Auth")
-            elif "AADSTS50058" in error_msg:
-                self.status_label.text = "Silent sign-in failed - try Device Auth"
-                self.print_to_console("Silent sign-in failed - try Device Auth")
-            else:
-                self.status_label.text = f"Connection error: {error_msg[:50]}..."
-                self.print_to_console(f"Connection error: {error_msg}")
-            self.status_label.style.color = "red"
+                if success:
+                    self._set_status("Connection successful!", "green")
+                    self.print_to_console("Connection successful!")
+                    
+                    # Auto-save successful connection settings
+                    self.settings_manager.update(
+                        team_url=team_url,
+                        document_folder=folder_path
+                    )
+                    self._start_listing_prefetch(team_url, folder_path)
+                else:
+                    self._set_status("Connection failed - check URL and try again", "red")
+                    self.print_to_console("Connection failed - check URL and try again")
+            except Exception as e:
+                error_msg = str(e)
+                # Errors can carry several codes; explain the first one we know
+                known_code = next(
+                    (code for code in AADSTS_CODE_PATTERN.findall(error_msg) if code in AADSTS_MESSAGES),
+                    None
+                )
+                known_message = AADSTS_MESSAGES.get(known_code)
+                if known_message:
+                    self._set_status(known_message, "red")
+                    self.print_to_console(known_message)
+                else:
+                    self._set_status(f"Connection error: {error_msg[:50]}...", "red")
+                    self.print_to_console(f"Connection error: {error_msg}")
+            finally:
+                spinner.cancel()
     
     async def browse_files(self, widget):
         """Browse files in SharePoint"""
-        team_url = self.url_input.value.strip()
-        folder_path = self.folder_input.value.strip()
+        team_url, folder_path = self._connection_inputs()
         
         if not team_url:
-            self.status_label.text = "Please enter a team URL and test connection first"
-            self.status_label.style.color = "red"
+            self._set_status("Please enter a team URL and test connection first", "red")
             return
         
-        self.status_label.text = "Loading files..."
-        self.status_label.style.color = "orange"
+        self._set_status("Loading files...", "orange")
         self.print_to_console("Loading files...")
         
         try:
             # Clear the files text area first
             self.files_text.value = ""
             
-            # Get all files and folders
-            files = await self.sharepoint_client.get_all_files(team_url, folder_path)
+            # Get all files and folders; a newer browse replaces one that is
+            # still loading, so stale results never reach the files area
+            if self._browse_task is not None and not self._browse_task.done():
+                self._browse_task.cancel()
+            self._browse_task = task = asyncio.ensure_future(self._fetch_listing(team_url, folder_path))
+            try:
+                files = await task
+            except asyncio.CancelledError:
+                if self._browse_task is task:
+                    raise  # Cancelled from outside, not superseded
+                return
             
             if not files:
                 self.files_text.value = "No items found"
-                self.status_label.text = "No items found"
-                self.status_label.style.color = "orange"
+                self._set_status("No items found", "orange")
                 self.print_to_console("No items found")
                 return
             
             # Format files as a table
-            header = f"{'Name':<40} {'Type':<10} {'Size':<12} {'Modified':<20}\n"
-            header += "-" * 82 + "\n"
-            file_text = header
+            lines = [
+                f"{'Name':<40} {'Type':<10} {'Size':<12} {'Modified':<20}\n",
+                "-" * 82 + "\n"
+            ]
             
             excel_files = []
             folder_count = 0
             file_count = 0
             
             for file_info in files:
-                name = file_info['name'][:37] + "..." if len(file_info['name']) > 40 else file_info['name']
+                name = file_info['name']
+                if len(name) > 40:
+                    name = name[:37] + "..."
                 
                 if file_info['type'] == 'folder':
                     file_type = "Folder"
@@ -529,7 +764,7 @@ This may take a few moments after you authenticate."""
                     folder_count += 1
                 else:
                     file_count += 1
-                    if file_info['name'].lower().endswith(('.xlsx', '.xlsm', '.xls')):
+                    if file_info['name'].lower().endswith(EXCEL_EXTENSIONS):
                         file_type = "Excel"
                         excel_files.append(file_info)
                     else:
@@ -538,11 +773,10 @@ This may take a few moments after you authenticate."""
                 
                 modified = self.format_date(file_info.get('modified', 'Unknown'))
                 
-                file_text += f"{name:<40} {file_type:<10} {size:<12} {modified:<20}\n"
+                lines.append(f"{name:<40} {file_type:<10} {size:<12} {modified:<20}\n")
             
-            self.files_text.value = file_text
-            self.status_label.text = f"Found {folder_count} folders, {file_count} files ({len(excel_files)} Excel)"
-            self.status_label.style.color = "green"
+            self.files_text.value = "".join(lines)
+            self._set_status(f"Found {folder_count} folders, {file_count} files ({len(excel_files)} Excel)", "green")
             self.print_to_console(f"Found {folder_count} folders, {file_count} files ({len(excel_files)} Excel)")
             
             # Show Excel file selection dialog if any Excel files found
@@ -550,38 +784,71 @@ This may take a few moments after you authenticate."""
                 await self.show_excel_selection_dialog(excel_files)
             
         except Exception as e:
-            self.status_label.text = f"Error browsing files: {str(e)}"
-            self.status_label.style.color = "red"
+            self._set_status(f"Error browsing files: {str(e)}", "red")
             self.print_to_console(f"Error browsing files: {str(e)}")
     
+    async def _fetch_listing(self, team_url, folder_path):
+        """Return the folder listing, using the prefetched one when it matches"""
+        files = await self._take_prefetched_listing(team_url, folder_path)
+        if files is None:
+            # A click on Browse Files asks for the folder as it is now, so it
+            # bypasses the listing cache; clicking again refreshes the list
+            files = await self.sharepoint_client.get_all_files(team_url, folder_path, use_cache=False)
+        return files
+    
+    def _start_listing_prefetch(self, team_url, folder_path):
+        """Fetch the folder listing in the background so Browse Files is instant"""
+        self._cancel_listing_prefetch()
+        self._prefetch_key = (team_url, folder_path)
+        self._prefetch_task = asyncio.ensure_future(
+            self.sharepoint_client.get_all_files(team_url, folder_path)
+        )
+        # Retrieve any error so an unused failed prefetch is not reported
+        self._prefetch_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    
+    def _cancel_listing_prefetch(self):
+        """Cancel the background folder listing, if any"""
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+        self._prefetch_task = None
+        self._prefetch_key = None
+    
+    async def _take_prefetched_listing(self, team_url, folder_path):
+        """Return the prefetched listing for this folder, or None to fetch it now"""
+        task = self._prefetch_task
+        if task is None or self._prefetch_key != (team_url, folder_path):
+            return None
+        
+        # A listing is only used once; later browses fetch a fresh one
+        self._prefetch_task = None
+        self._prefetch_key = None
+        try:
+            return await task
+        except Exception:
+            return None
+    
     def format_file_size(self, size_bytes):
         """Format file size in human readable format"""
-        if size_bytes == 0:
-            return "0 B"
-        elif size_bytes < 1024:
+        if size_bytes < KB:
             return f"{size_bytes} B"
-        elif size_bytes < 1024 * 1024:
-            return f"{size_bytes // 1024} KB"
-        else:
-            return f"{size_bytes // (1024 * 1024)} MB"
+        if size_bytes < MB:
+            return f"{size_bytes >> 10} KB"
+        return f"{size_bytes >> 20} MB"
     
     def format_date(self, date_str):
         """Format date string to readable format"""
         if date_str == 'Unknown':
             return date_str
         try:
-            from datetime import datetime
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            return dt.strftime('%Y-%m-%d %H:%M')
-        except:
+            return _format_iso_date(date_str)
+        except (ValueError, AttributeError):  # Not an ISO timestamp string
             return date_str[:16] if len(date_str) > 16 else date_str
     
     async def show_excel_selection_dialog(self, excel_files):
         """Show selection dialog for Excel files with proper list and buttons"""
         try:
-            # Create a new window for file selection
-            selection_window = toga.Window(title="Select Excel File to Update")
-            selection_window.size = (300, 400)
+            # The window and its widgets are built once and reused
+            selection_window = self._ensure_selection_window()
             
             # Center the dialog relative to main window
             try:
@@ -597,81 +864,99 @@ This may take a few moments after you authenticate."""
                 # If centering fails, just use default position
                 pass
             
-            # Main container
-            main_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
-            
-            # Title
-            title_label = toga.Label(
-                f"Select Excel file to update:",
-                style=Pack(margin=(0, 0, 10, 0), font_weight="bold", text_align="center")
-            )
-            
-            count_label = toga.Label(
-                f"({len(excel_files)} files found)",
-                style=Pack(margin=(0, 0, 15, 0), text_align="center")
-            )
-            
-            # Create file list using DetailedList
-            self.file_list_selection = toga.DetailedList(
-                style=Pack(height=250, margin=(0, 0, 15, 0))
-            )
+            self._selection_count_label.text = f"({len(excel_files)} files found)"
             
-            # Populate the list with Excel files
-            for i, file_info in enumerate(excel_files):
-                modified_date = self.format_date(file_info.get('modified', 'Unknown'))
-                size = self.format_file_size(file_info.get('size', 0))
-                
-                self.file_list_selection.data.append({
+            # Populate the list with Excel files in a single assignment
+            self.file_list_selection.data = [
+                {
                     "title": file_info['name'],
-                    "subtitle": f"{size} - {modified_date}",
+                    "subtitle": f"{self.format_file_size(file_info.get('size', 0))} - "
+                                f"{self.format_date(file_info.get('modified', 'Unknown'))}",
                     "icon": None
-                })
-            
-            # Buttons container
-            button_box = toga.Box(style=Pack(direction=ROW, margin=(5, 0, 0, 0)))
-            
-            # Cancel button
-            cancel_button = toga.Button(
-                "Cancel",
-                on_press=lambda widget: self.close_selection_dialog(selection_window, None),
-                style=Pack(margin=(0, 5, 0, 0), width=100)
-            )
+                }
+                for file_info in excel_files
+            ]
             
-            # Update button (initially disabled)
-            self.update_button = toga.Button(
-                "Update",
-                on_press=lambda widget: self.close_selection_dialog(selection_window, excel_files),
-                style=Pack(margin=(0, 0, 0, 0), width=100)
-            )
+            # Map rows back to their position so the selection lookup is O(1)
+            self._row_to_index = {id(row): i for i, row in enumerate(self.file_list_selection.data)}
             
-            # Initially disable update button
+            # Nothing is selected in the fresh list
             self.update_button.enabled = False
             
-            # Add selection change handler to enable/disable update button
-            self.file_list_selection.on_select = self.on_file_list_selection_change
-            
-            # Add components
-            button_box.add(cancel_button)
-            button_box.add(self.update_button)
-            
-            main_box.add(title_label)
-            main_box.add(count_label)
-            main_box.add(self.file_list_selection)
-            main_box.add(button_box)
-            
-            # Set content and show
-            selection_window.content = main_box
-            selection_window.show()
-            
             # Store reference for later use
-            self.selection_window = selection_window
             self.selected_excel_files = excel_files
             
+            selection_window.show()
+            
         except Exception as e:
             self.print_to_console(f"Error creating selection dialog: {e}")
             # Fallback to simple console-based selection
             await self.show_simple_excel_selection(excel_files)
     
+    def _ensure_selection_window(self):
+        """Create the Excel file selection window on first use"""
+        if self.selection_window is not None:
+            return self.selection_window
+        
+        # Closing the window only hides it so it can be shown again
+        selection_window = toga.Window(
+            title="Select Excel File to Update",
+            on_close=self.on_selection_window_close
+        )
+        selection_window.size = (300, 400)
+        
+        # Main container
+        main_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
+        
+        # Title
+        title_label = toga.Label(
+            f"Select Excel file to update:",
+            style=Pack(margin=(0, 0, 10, 0), font_weight="bold", text_align="center")
+        )
+        
+        self._selection_count_label = toga.Label(
+            "",
+            style=Pack(margin=(0, 0, 15, 0), text_align="center")
+        )
+        
+        # Create file list using DetailedList
+        self.file_list_selection = toga.DetailedList(
+            style=Pack(height=250, margin=(0, 0, 15, 0))
+        )
+        
+        # Buttons container
+        button_box = toga.Box(style=Pack(direction=ROW, margin=(5, 0, 0, 0)))
+        
+        # Cancel button
+        cancel_button = toga.Button(
+            "Cancel",
+            on_press=lambda widget: self.close_selection_dialog(self.selection_window, None),
+            style=Pack(margin=(0, 5, 0, 0), width=100)
+        )
+        
+        # Update button (disabled until a file is selected)
+        self.update_button = toga.Button(
+            "Update",
+            on_press=lambda widget: self.close_selection_dialog(self.selection_window, self.selected_excel_files),
+            style=Pack(margin=(0, 0, 0, 0), width=100)
+        )
+        
+        # Add selection change handler to enable/disable update button
+        self.file_list_selection.on_select = self.on_file_list_selection_change
+        
+        # Add components
+        button_box.add(cancel_button, self.update_button)
+        main_box.add(title_label, self._selection_count_label, self.file_list_selection, button_box)
+        
+        selection_window.content = main_box
+        self.selection_window = selection_window
+        return selection_window
+    
+    def on_selection_window_close(self, window, **kwargs):
+        """Hide the selection window instead of destroying it"""
+        window.hide()
+        return False
+    
     def on_file_list_selection_change(self, widget):
         """Handle file list selection change to enable/disable update button"""
         try:
@@ -684,51 +969,42 @@ This may take a few moments after you authenticate."""
             self.print_to_console(f"Error handling selection change: {e}")
     
     def close_selection_dialog(self, window, excel_files):
-        """Close the selection dialog and handle the result"""
+        """Hide the selection dialog and handle the result"""
         try:
             if excel_files is None:
                 # Cancel was pressed
                 self.print_to_console("File selection cancelled")
-                window.close()
+                window.hide()
                 return
             
-            # Get selected file - need to find the index manually since selection returns Row object
+            # Get selected file - selection returns a Row object, so map it back to its index
             if hasattr(self, 'file_list_selection') and self.file_list_selection.selection is not None:
-                # Find the selected item's index in the data
-                selected_row = self.file_list_selection.selection
-                selected_index = None
-                
-                # Find the index by comparing with the data
-                for i, data_item in enumerate(self.file_list_selection.data):
-                    if (data_item.title == selected_row.title and 
-                        data_item.subtitle == selected_row.subtitle):
-                        selected_index = i
-                        break
+                selected_index = self._row_to_index.get(id(self.file_list_selection.selection))
                 
                 if selected_index is not None:
                     selected_file = excel_files[selected_index]
                     
-                    # Close window first
-                    window.close()
+                    # Hide window first
+                    window.hide()
                     
                     # Process the selection
                     asyncio.create_task(self.update_selected_excel_file(selected_file))
                 else:
                     self.print_to_console("Could not determine selected file")
-                    window.close()
+                    window.hide()
             else:
                 self.print_to_console("No file selected")
-                window.close()
+                window.hide()
                 
         except Exception as e:
             self.print_to_console(f"Error processing file selection: {e}")
-            window.close()
+            window.hide()
     
     async def show_simple_excel_selection(self, excel_files):
         """Fallback simple selection method if custom dialog fails"""
-        self.print_to_console(f"\nFound {len(excel_files)} Excel files:")
-        for i, file_info in enumerate(excel_files, 1):
-            self.print_to_console(f"{i}. {file_info['name']}")
+        lines = [f"\nFound {len(excel_files)} Excel files:"]
+        lines.extend(f"{i}. {file_info['name']}" for i, file_info in enumerate(excel_files, 1))
+        self.print_to_console("\n".join(lines))
         
         dialog_message = f"Found {len(excel_files)} Excel files. Please check the console output for the list."
         await self.main_window.dialog(toga.InfoDialog("Excel Files Found", dialog_message))
@@ -736,47 +1012,51 @@ This may take a few moments after you authenticate."""
     async def update_selected_excel_file(self, selected_file):
         """Process selected Excel file - download, open, and extract tables"""
         self.print_to_console(f"Processing Excel file: {selected_file['name']}")
-        self.status_label.text = f"Processing: {selected_file['name']}"
-        self.status_label.style.color = "orange"
+        self._set_status(f"Processing: {selected_file['name']}", "orange")
         
         try:
+            from .excel_manager import ExcelManager
+            
             # Use Excel manager with context manager for automatic cleanup
             with ExcelManager(self.sharepoint_client) as excel_manager:
-                # Download and open the file
-                self.print_to_console("Downloading and opening Excel file...")
-                success = await excel_manager.download_and_open_excel_file(selected_file)
-                
-                if not success:
-                    self.print_to_console("Failed to download or open Excel file")
-                    self.status_label.text = "Error: Failed to open Excel file"
-                    self.status_label.style.color = "red"
-                    return
-                
-                self.print_to_console("Excel file opened successfully")
-                
-                # Extract available tables
-                self.print_to_console("Extracting available tables and worksheets...")
-                tables = excel_manager.get_available_tables()
+                # An unchanged file version was already scanned; skip the download
+                tables = await excel_manager.get_cached_tables(selected_file)
+                if tables is not None:
+                    self.print_to_console("Using cached tables for unchanged Excel file")
+                else:
+                    # Download and open the file
+                    self.print_to_console("Downloading and opening Excel file...")
+                    success = await excel_manager.download_and_open_excel_file(selected_file)
+                    
+                    if not success:
+                        self.print_to_console("Failed to download or open Excel file")
+                        self._set_status("Error: Failed to open Excel file", "red")
+                        return
+                    
+                    self.print_to_console("Excel file opened successfully")
+                    
+                    # Extract available tables in a worker thread so the UI stays responsive
+                    self.print_to_console("Extracting available tables and worksheets...")
+                    tables = await self.loop.run_in_executor(None, excel_manager.get_available_tables)
                 
                 if not tables:
                     self.print_to_console("No tables or data found in Excel file")
-                    self.status_label.text = "No tables found in Excel file"
-                    self.status_label.style.color = "orange"
+                    self._set_status("No tables found in Excel file", "orange")
                     return
                 
-                # Display table information
-                self.print_to_console(f"\nFound {len(tables)} tables/worksheets:")
-                self.print_to_console("-" * 50)
+                # Display table information as one console entry
+                lines = [f"\nFound {len(tables)} tables/worksheets:", "-" * 50]
                 
                 for i, table in enumerate(tables, 1):
-                    self.print_to_console(f"{i}. {table['description']}")
-                    if table['sample_headers']:
-                        headers = ", ".join(table['sample_headers'])
-                        self.print_to_console(f"   Sample columns: {headers}")
-                    self.print_to_console("")
+                    lines.append(f"{i}. {table.description}")
+                    if table.sample_headers:
+                        headers = ", ".join(table.sample_headers)
+                        lines.append(f"   Sample columns: {headers}")
+                    lines.append("")
+                
+                self.print_to_console("\n".join(lines))
                 
-                self.status_label.text = f"Found {len(tables)} tables in {selected_file['name']}"
-                self.status_label.style.color = "green"
+                self._set_status(f"Found {len(tables)} tables in {selected_file['name']}", "green")
                 
                 # TODO: Here you could add functionality to:
                 # 1. Let user select which table to update
@@ -789,5 +1069,4 @@ This may take a few moments after you authenticate."""
         except Exception as e:
             error_msg = str(e)
             self.print_to_console(f"Error processing Excel file: {error_msg}")
-            self.status_label.text = f"Error: {error_msg[:50]}..."
-            self.status_label.style.color = "red"
\ No newline at end of file
+            self._set_status(f"Error: {error_msg[:50]}...", "red")
\ No newline at end of file
@@ -5,13 +5,34 @@ Handles persistent storage of user preferences and configuration
 import json
 import logging
 import os
-from dataclasses import asdict, dataclass
+import sys
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    # Optional faster JSON backend
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize settings to indented UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Any:
+    """Parse JSON settings data"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 @dataclass
 class AppSettings:
     """Data class to hold application settings"""
@@ -28,15 +49,18 @@ class AppSettings:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert settings to dictionary"""
-        return asdict(self)
+        # All fields are plain values, so asdict's recursive deep copy is not needed
+        return dict(self.__dict__)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AppSettings':
         """Create settings from dictionary"""
-        # Filter out any keys that don't match our dataclass fields
-        valid_keys = {field.name for field in cls.__dataclass_fields__.values()}
-        filtered_data = {k: v for k, v in data.items() if k in valid_keys}
-        return cls(**filtered_data)
+        # Only pass keys that match our dataclass fields
+        return cls(**{k: data[k] for k in SETTINGS_FIELDS if k in data})
+
+
+# Names of the AppSettings fields, in declaration order
+SETTINGS_FIELDS = tuple(field.name for field in fields(AppSettings))
 
 
 class SettingsManager:
@@ -48,6 +72,11 @@ class SettingsManager:
         self._config_dir = self._get_config_directory()
         self._config_file = self._config_dir / "settings.json"
         
+        # Settings as last read from or written to the settings file, or None
+        # when the file does not hold them; compared with the current settings
+        # so changes made through any path are saved
+        self._saved_state: Optional[Dict[str, Any]] = None
+        
         # Ensure config directory exists
         self._config_dir.mkdir(parents=True, exist_ok=True)
         
@@ -59,7 +88,7 @@ class SettingsManager:
         if os.name == 'nt':  # Windows
             config_base = Path(os.environ.get('APPDATA', Path.home()))
         elif os.name == 'posix':  # macOS, Linux
-            if 'darwin' in os.sys.platform.lower():  # macOS
+            if sys.platform == 'darwin':  # macOS
                 config_base = Path.home() / "Library" / "Application Support"
             else:  # Linux
                 config_base = Path.home() / ".config"
@@ -73,6 +102,11 @@ class SettingsManager:
         """Get current settings"""
         return self._settings
     
+    @property
+    def config_file(self) -> Path:
+        """Get the path of the settings file"""
+        return self._config_file
+    
     def get(self, key: str, default: Any = None) -> Any:
         """Get a specific setting value"""
         return getattr(self._settings, key, default)
@@ -93,37 +127,42 @@ class SettingsManager:
         """Load settings from file"""
         try:
             if self._config_file.exists():
-                with open(self._config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = _loads(self._config_file.read_bytes())
                 
                 # Validate and load settings
                 self._settings = AppSettings.from_dict(data)
+                self._saved_state = self._settings.to_dict()
                 logger.info(f"Settings loaded from {self._config_file}")
                 return True
             else:
                 logger.info("No settings file found, using defaults")
+                self._saved_state = None
                 return False
                 
-        except (json.JSONDecodeError, IOError, TypeError) as e:
+        except (ValueError, IOError, TypeError) as e:
             logger.warning(f"Error loading settings from {self._config_file}: {e}")
             logger.info("Using default settings")
             self._settings = AppSettings()  # Reset to defaults
+            self._saved_state = None
             return False
     
     def save(self) -> bool:
-        """Save current settings to file"""
+        """Save current settings to file, skipping the write if nothing changed"""
+        state = self._settings.to_dict()
+        if state == self._saved_state and self._config_file.exists():
+            return True
+        
+        # Write a temp file and swap it in, so the settings file is never
+        # left half-written; the fsync makes sure the data is on disk before
+        # the rename, or a crash could leave an empty file behind
+        temp_file = self._config_file.with_suffix('.json.tmp')
         try:
-            # Create backup of existing file
-            if self._config_file.exists():
-                backup_file = self._config_file.with_suffix('.json.backup')
-                # Remove existing backup if it exists
-                if backup_file.exists():
-                    backup_file.unlink()
-                self._config_file.rename(backup_file)
-            
-            # Write new settings
-            with open(self._config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings.to_dict(), f, indent=2, ensure_ascii=False)
+            with open(temp_file, 'wb') as f:
+                f.write(_dumps(state))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self._config_file)
+            self._saved_state = state
             
             logger.info(f"Settings saved to {self._config_file}")
             return True
@@ -131,11 +170,11 @@ class SettingsManager:
         except (IOError, TypeError) as e:
             logger.error(f"Error saving settings to {self._config_file}: {e}")
             
-            # Try to restore backup if save failed
-            backup_file = self._config_file.with_suffix('.json.backup')
-            if backup_file.exists():
-                backup_file.rename(self._config_file)
-                logger.info("Restored settings from backup")
+            # The previous settings file is untouched; drop the partial write
+            try:
+                temp_file.unlink()
+            except OSError:
+                pass
             
             return False
     
@@ -163,8 +202,7 @@ class SettingsManager:
     def export_settings(self, file_path: Path) -> bool:
         """Export settings to a specified file"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self._settings.to_dict(), f, indent=2, ensure_ascii=False)
+            Path(file_path).write_bytes(_dumps(self._settings.to_dict()))
             return True
         except Exception as e:
             logger.error(f"Error exporting settings: {e}")
@@ -173,8 +211,7 @@ class SettingsManager:
     def import_settings(self, file_path: Path) -> bool:
         """Import settings from a specified file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _loads(Path(file_path).read_bytes())
             
             self._settings = AppSettings.from_dict(data)
             return True
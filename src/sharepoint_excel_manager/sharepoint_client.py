@@ -3,49 +3,204 @@ SharePoint client for interacting with Teams SharePoint sites
 Uses modern authentication methods compatible with Conditional Access policies
 """
 import asyncio
+import functools
+import hashlib
 import json
 import logging
 import os
-import threading
+import time
 import urllib.parse
 import webbrowser
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import requests
-from msal import PublicClientApplication
+from msal import PublicClientApplication, SerializableTokenCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import private_cache_dir, write_private_file
+
+try:
+    # Optional faster JSON backend
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# File extensions treated as Excel workbooks
+EXCEL_EXTENSIONS = frozenset({".xlsx", ".xlsm", ".xls"})
+
+# Size of the chunks written to disk while streaming a download (1 MiB)
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# DriveItem fields needed to build a folder listing; everything else is
+# left out of the Graph response
+LISTING_SELECT_FIELDS = ",".join([
+    "id", "name", "webUrl", "size", "eTag", "lastModifiedDateTime",
+    "file", "folder", "parentReference", "@microsoft.graph.downloadUrl",
+])
+
+# Files up to this size are uploaded in a single request; larger ones go
+# through an upload session in slices (Graph requires multiples of 320 KiB)
+SIMPLE_UPLOAD_LIMIT = 4 << 20
+UPLOAD_CHUNK_SIZE = 32 * 320 * 1024
+
+# Pooled connections kept per host; enough for the concurrent workbook downloads
+HTTP_POOL_SIZE = 16
+
+# Throttled (429) and transient server errors are retried with backoff,
+# honouring Retry-After; the last response is returned if retries run out
+GRAPH_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    raise_on_status=False,
+)
+
+# Only URLs on this host are sent the bearer token
+GRAPH_ROOT = "https://graph.microsoft.com/"
+
+# Folder listings persisted between runs in the per-user cache. SharePoint
+# does not reliably change a folder's eTag when a file in it is edited, so a
+# cached listing is only reused for a short time, and only while the folder
+# eTag is unchanged
+LISTING_CACHE_NAME = "listings"
+LISTING_CACHE_TTL = 5 * 60  # seconds
+
+
+def _response_json(response: requests.Response) -> Any:
+    """Parse a Graph JSON response body"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
 
 class SharePointClient:
-    def __init__(self):
+    def __init__(self, token_cache_file: Optional[Path] = None):
         self.access_token = None
         self.authenticated = False
         self.site_url = None
         
+        # Graph site IDs by SharePoint site URL; they never change for a site,
+        # so each one is looked up once per sign-in
+        self._site_ids: Dict[str, str] = {}
+        
         # MSAL configuration for SharePoint - using Microsoft Graph Command Line Tools
         # This client ID supports both device flow and interactive authentication
         self.client_id = "14d82eec-204b-4c2f-b7e8-296a70dab67e"  # Microsoft Graph Command Line Tools
         self.authority = "https://login.microsoftonline.com/common"
         self.scope = ["https://graph.microsoft.com/.default"]
         
-        # Initialize MSAL app
-        self.app = PublicClientApplication(
-            client_id=self.client_id,
-            authority=self.authority
-        )
+        # MSAL app, created on first use since its setup may contact the authority
+        self._app = None
+        
+        # Device code flow that wait_for_device_flow is polling, if any
+        self._device_flow = None
+        
+        # Tokens are kept in token_cache_file, when given, so the next start
+        # can sign in silently instead of opening the browser again
+        self.token_cache = SerializableTokenCache()
+        self._token_cache_file = token_cache_file
+        
+        # One HTTP session for all Graph calls so connections are kept alive
+        # and reused instead of paying a TCP/TLS handshake per request
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE, max_retries=GRAPH_RETRY))
+    
+    @property
+    def app(self) -> PublicClientApplication:
+        """MSAL application, created the first time it is needed"""
+        if self._app is None:
+            self._load_token_cache()
+            self._app = PublicClientApplication(
+                client_id=self.client_id,
+                authority=self.authority,
+                token_cache=self.token_cache
+            )
+        return self._app
+    
+    def _load_token_cache(self) -> None:
+        """Fill the token cache from the cache file, if there is one"""
+        if self._token_cache_file is None:
+            return
+        try:
+            self.token_cache.deserialize(self._token_cache_file.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read token cache: {e}")
+    
+    def save_token_cache(self) -> None:
+        """Write the token cache to the cache file if sign-in changed it (blocking)"""
+        if self._token_cache_file is None or not self.token_cache.has_state_changed:
+            return
+        
+        # The cache holds refresh tokens, so the file is only readable by the
+        # user. It is synced before the rename so a crash cannot replace the
+        # cache with an empty file
+        temp_file = self._token_cache_file.with_suffix(".tmp")
+        try:
+            fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.token_cache.serialize())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self._token_cache_file)
+            self.token_cache.has_state_changed = False
+        except OSError as e:
+            logger.warning(f"Could not write token cache: {e}")
+            temp_file.unlink(missing_ok=True)
+    
+    def close(self) -> None:
+        """Stop waiting for a device code sign-in and close the HTTP session"""
+        # MSAL polls until the flow expires, which can take 15 minutes; marking
+        # it expired ends the wait within a second, so the worker thread does
+        # not hold up interpreter exit
+        device_flow = self._device_flow
+        if device_flow is not None:
+            device_flow["expires_at"] = 0
+        self.session.close()
+    
+    def warm_up_connection(self) -> None:
+        """Open a pooled connection to Graph ahead of the first real request (blocking)"""
+        try:
+            # Any response will do; the point is the DNS lookup and TLS handshake
+            self.session.head("https://graph.microsoft.com/v1.0/", timeout=10)
+        except requests.RequestException as e:
+            logger.debug(f"Graph connection warm-up failed: {e}")
+    
+    def wait_for_device_flow(self, flow: Dict) -> Dict:
+        """Poll until the user completes a device code sign-in (blocking)
+        
+        close() ends the wait early, and MSAL then returns its last error.
+        """
+        self._device_flow = flow
+        try:
+            return self.app.acquire_token_by_device_flow(flow)
+        finally:
+            self._device_flow = None
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking MSAL or HTTP call in a worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
     
     async def authenticate(self, site_url: str) -> bool:
         """Authenticate using MSAL with device code flow or interactive login"""
         try:
             self.site_url = site_url
+            # A different account may be signed in after this, so look sites up afresh
+            self._site_ids.clear()
             
             # Try to get token silently first (from cache)
-            accounts = self.app.get_accounts()
+            # The first use of self.app creates it, so do that in the worker too
+            accounts = await self._run_blocking(lambda: self.app.get_accounts())
             if accounts:
                 logger.info("Found cached account, attempting silent authentication...")
-                result = self.app.acquire_token_silent(
+                result = await self._run_blocking(
+                    self.app.acquire_token_silent,
                     scopes=self.scope,
                     account=accounts[0]
                 )
@@ -53,11 +208,13 @@ class SharePointClient:
                     self.access_token = result["access_token"]
                     self.authenticated = True
                     logger.info("Silent authentication successful")
+                    await self._run_blocking(self.save_token_cache)
                     return True
             
             # If silent auth fails, try interactive authentication
             logger.info("Attempting interactive authentication...")
-            result = self.app.acquire_token_interactive(
+            result = await self._run_blocking(
+                self.app.acquire_token_interactive,
                 scopes=self.scope,
                 prompt="select_account"  # Allow user to select account
             )
@@ -66,6 +223,7 @@ class SharePointClient:
                 self.access_token = result["access_token"]
                 self.authenticated = True
                 logger.info("Interactive authentication successful")
+                await self._run_blocking(self.save_token_cache)
                 return True
             else:
                 error_msg = result.get("error_description", "Unknown authentication error")
@@ -76,13 +234,20 @@ class SharePointClient:
             logger.error(f"Authentication error: {e}")
             return False
     
-    async def authenticate_device_code(self, site_url: str) -> bool:
-        """Alternative authentication using device code flow"""
+    async def authenticate_device_code(self, site_url: str,
+                                       show_device_code: Optional[Callable[[str], None]] = None) -> bool:
+        """Alternative authentication using device code flow
+        
+        The sign-in instructions (URL and code) are passed to show_device_code
+        so the caller can display them; without it they are only logged.
+        """
         try:
             self.site_url = site_url
+            # A different account may be signed in after this, so look sites up afresh
+            self._site_ids.clear()
             
             # Initiate device code flow
-            flow = self.app.initiate_device_flow(scopes=self.scope)
+            flow = await self._run_blocking(lambda: self.app.initiate_device_flow(scopes=self.scope))
             
             if "user_code" not in flow:
                 raise Exception("Failed to create device flow")
@@ -91,33 +256,37 @@ class SharePointClient:
             verification_uri = flow.get("verification_uri", "")
             user_code = flow.get("user_code", "")
             
-            print("\n" + "="*60)
-            print("DEVICE CODE AUTHENTICATION")
-            print("="*60)
-            print(f"1. Go to: {verification_uri}")
-            print(f"2. Enter code: {user_code}")
-            print("="*60)
-            print("Opening browser automatically...")
-            print("="*60 + "\n")
+            instructions = (
+                "Device code authentication required:\n"
+                f"1. Go to: {verification_uri}\n"
+                f"2. Enter code: {user_code}\n"
+                "Opening browser automatically..."
+            )
+            if show_device_code is not None:
+                show_device_code(instructions)
+            else:
+                logger.info(instructions)
             
             # Open browser automatically (non-blocking)
             if verification_uri:
                 def open_browser():
                     try:
                         webbrowser.open(verification_uri)
-                        print(f"Browser opened to: {verification_uri}")
+                        logger.info(f"Browser opened to: {verification_uri}")
                     except Exception as e:
-                        print(f"Could not open browser: {e}")
+                        logger.warning(f"Could not open browser: {e}")
                 
-                threading.Thread(target=open_browser, daemon=True).start()
+                # Hand the call to the shared thread pool instead of a new thread
+                asyncio.get_running_loop().run_in_executor(None, open_browser)
             
-            # Complete the device code flow (this will block, but that's expected)
-            result = self.app.acquire_token_by_device_flow(flow)
+            # Complete the device code flow; MSAL polls until the user signs in
+            result = await self._run_blocking(self.wait_for_device_flow, flow)
             
             if result and "access_token" in result:
                 self.access_token = result["access_token"]
                 self.authenticated = True
                 logger.info("Device code authentication successful")
+                await self._run_blocking(self.save_token_cache)
                 return True
             else:
                 error_msg = result.get("error_description", "Unknown authentication error")
@@ -130,6 +299,10 @@ class SharePointClient:
     
     def _get_site_id_from_url(self, site_url: str) -> Optional[str]:
         """Extract site ID from SharePoint URL using Microsoft Graph"""
+        site_id = self._site_ids.get(site_url)
+        if site_id:
+            return site_id
+        
         try:
             # Parse the site URL to get hostname and site path
             parsed_url = urllib.parse.urlparse(site_url)
@@ -144,10 +317,13 @@ class SharePointClient:
                 "Accept": "application/json"
             }
             
-            response = requests.get(graph_url, headers=headers)
+            response = self.session.get(graph_url, headers=headers)
             if response.status_code == 200:
-                site_info = response.json()
-                return site_info.get("id")
+                site_info = _response_json(response)
+                site_id = site_info.get("id")
+                if site_id:
+                    self._site_ids[site_url] = site_id
+                return site_id
             else:
                 logger.error(f"Failed to get site ID: {response.status_code} - {response.text}")
                 return None
@@ -156,19 +332,24 @@ class SharePointClient:
             logger.error(f"Error getting site ID: {e}")
             return None
     
-    async def test_connection(self, team_url: str, folder_path: str = "") -> bool:
-        """Test connection to SharePoint site using Microsoft Graph"""
+    async def test_connection(self, team_url: str, folder_path: str = "",
+                              show_device_code: Optional[Callable[[str], None]] = None) -> bool:
+        """Test connection to SharePoint site using Microsoft Graph
+        
+        show_device_code receives the sign-in instructions if the connection
+        falls back to device code authentication.
+        """
         try:
             if not self.authenticated:
                 success = await self.authenticate(team_url)
                 if not success:
                     # Try device code as fallback
-                    success = await self.authenticate_device_code(team_url)
+                    success = await self.authenticate_device_code(team_url, show_device_code)
                     if not success:
                         return False
             
             # Test connection by getting site information
-            site_id = self._get_site_id_from_url(team_url)
+            site_id = await self._run_blocking(self._get_site_id_from_url, team_url)
             if site_id:
                 logger.info("Connection test successful")
                 return True
@@ -180,84 +361,209 @@ class SharePointClient:
             logger.error(f"Connection test failed: {e}")
             return False
     
-    async def get_excel_files(self, team_url: str, folder_path: str = "") -> List[Dict]:
+    async def get_excel_files(self, team_url: str, folder_path: str = "", use_cache: bool = True) -> List[Dict]:
         """Get list of Excel files from SharePoint folder using Microsoft Graph"""
-        all_files = await self.get_all_files(team_url, folder_path)
+        all_files = await self.get_all_files(team_url, folder_path, use_cache)
         
-        # Filter for Excel files
-        excel_files = []
-        for item in all_files:
-            if item.get("name", "").lower().endswith(('.xlsx', '.xlsm', '.xls')):
-                excel_files.append(item)
+        # Filter for Excel files by extension (one set lookup per item)
+        excel_files = [
+            item for item in all_files
+            if os.path.splitext(item.get("name", ""))[1].lower() in EXCEL_EXTENSIONS
+        ]
         
         logger.info(f"Found {len(excel_files)} Excel files")
         return excel_files
     
-    async def get_all_files(self, team_url: str, folder_path: str = "") -> List[Dict]:
-        """Get list of all files and folders from SharePoint folder using Microsoft Graph"""
+    async def get_all_files(self, team_url: str, folder_path: str = "", use_cache: bool = True) -> List[Dict]:
+        """Get list of all files and folders from SharePoint folder using Microsoft Graph
+        
+        The listing is cached on disk and reused for a few minutes while the
+        folder's eTag is unchanged; pass use_cache=False to always fetch a
+        fresh listing.
+        """
         try:
             if not self.authenticated:
                 success = await self.authenticate(team_url)
                 if not success:
                     raise Exception("Authentication failed")
             
-            # Get site ID
-            site_id = self._get_site_id_from_url(team_url)
-            if not site_id:
-                raise Exception("Could not get site information")
-            
-            # Construct Graph API URL for drive items
-            if folder_path and folder_path.strip():
-                # If specific folder path provided, try to find that folder
-                folder_path = folder_path.strip('/')
-                graph_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{folder_path}:/children"
-            else:
-                # Default to root of default document library
-                graph_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root/children"
+            # The Graph requests and cache file I/O block, so run the listing
+            # in a worker thread and keep the event loop free to repaint
+            return await self._run_blocking(self._list_folder, team_url, folder_path, use_cache)
             
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Accept": "application/json"
-            }
-            
-            response = requests.get(graph_url, headers=headers)
+        except Exception as e:
+            logger.error(f"Error getting files: {e}")
+            raise
+    
+    def _list_folder(self, team_url: str, folder_path: str, use_cache: bool) -> List[Dict]:
+        """Fetch a folder listing, or reuse the cached one (blocking)"""
+        # Get site ID
+        site_id = self._get_site_id_from_url(team_url)
+        if not site_id:
+            raise Exception("Could not get site information")
+        
+        # Construct Graph API URL for the folder item
+        if folder_path and folder_path.strip():
+            # If specific folder path provided, try to find that folder
+            folder_path = folder_path.strip('/')
+            folder_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{folder_path}:"
+        else:
+            # Default to root of default document library
+            folder_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root"
+        
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Accept": "application/json"
+        }
+        
+        # A cheap metadata request rules out a cached listing once the folder
+        # has visibly changed; edits to files inside it may not show up here,
+        # which is why cached listings also expire after LISTING_CACHE_TTL
+        folder_etag = self._get_item_etag(folder_url, headers) if use_cache else None
+        cache_file = self._listing_cache_file(team_url, folder_path) if folder_etag else None
+        if cache_file is not None:
+            cached_items = self._load_cached_listing(cache_file, folder_etag)
+            if cached_items is not None:
+                logger.info(f"Found {len(cached_items)} items (cached)")
+                return cached_items
+        
+        # Only request the fields used below, and follow paging links so
+        # folders with more items than one page are listed in full
+        graph_url = f"{folder_url}/children"
+        params = {"$select": LISTING_SELECT_FIELDS}
+        drive_items = []
+        while graph_url:
+            response = self.session.get(graph_url, headers=headers, params=params)
             
             if response.status_code != 200:
                 logger.error(f"Failed to get files: {response.status_code} - {response.text}")
                 raise Exception(f"Failed to retrieve files: {response.status_code}")
             
-            files_data = response.json()
-            all_items = []
-            
-            # Process all items (files and folders)
-            for item in files_data.get("value", []):
-                if item.get("file"):  # It's a file
-                    all_items.append({
-                        "name": item["name"],
-                        "type": "file",
-                        "url": item["webUrl"],
-                        "download_url": item.get("@microsoft.graph.downloadUrl", ""),
-                        "modified": item.get("lastModifiedDateTime", "Unknown"),
-                        "size": item.get("size", 0),
-                        "id": item["id"]
-                    })
-                elif item.get("folder"):  # It's a folder
-                    all_items.append({
-                        "name": item["name"],
-                        "type": "folder",
-                        "url": item["webUrl"],
-                        "download_url": "",
-                        "modified": item.get("lastModifiedDateTime", "Unknown"),
-                        "size": item.get("folder", {}).get("childCount", 0),  # Use child count for folders
-                        "id": item["id"]
-                    })
+            files_data = _response_json(response)
+            drive_items.extend(files_data.get("value", []))
             
-            logger.info(f"Found {len(all_items)} items")
-            return all_items
+            # The next link already carries the query options
+            graph_url = files_data.get("@odata.nextLink")
+            params = None
+        
+        all_items = []
+        
+        # Process all items (files and folders)
+        for item in drive_items:
+            if item.get("file"):  # It's a file
+                all_items.append({
+                    "name": item["name"],
+                    "type": "file",
+                    "url": item["webUrl"],
+                    "download_url": item.get("@microsoft.graph.downloadUrl", ""),
+                    "modified": item.get("lastModifiedDateTime", "Unknown"),
+                    "size": item.get("size", 0),
+                    "id": item["id"],
+                    "etag": item.get("eTag", ""),
+                    "drive_id": item.get("parentReference", {}).get("driveId", "")
+                })
+            elif item.get("folder"):  # It's a folder
+                all_items.append({
+                    "name": item["name"],
+                    "type": "folder",
+                    "url": item["webUrl"],
+                    "download_url": "",
+                    "modified": item.get("lastModifiedDateTime", "Unknown"),
+                    "size": item.get("folder", {}).get("childCount", 0),  # Use child count for folders
+                    "id": item["id"]
+                })
+        
+        if cache_file is not None:
+            self._store_cached_listing(cache_file, folder_etag, all_items)
+        
+        logger.info(f"Found {len(all_items)} items")
+        return all_items
+    
+    def _get_item_etag(self, item_url: str, headers: Dict) -> Optional[str]:
+        """Get the eTag of a drive item, or None if it cannot be read"""
+        try:
+            response = self.session.get(item_url, headers=headers, params={"$select": "eTag"})
+            if response.status_code == 200:
+                return _response_json(response).get("eTag")
+        except requests.RequestException as e:
+            logger.warning(f"Could not read item eTag: {e}")
+        return None
+    
+    def _listing_cache_file(self, team_url: str, folder_path: str) -> Optional[Path]:
+        """Get the cache file for a site folder listing, or None if the cache cannot be used"""
+        try:
+            cache_dir = private_cache_dir(LISTING_CACHE_NAME)
+        except OSError as e:
+            logger.warning(f"Folder listing cache disabled: {e}")
+            return None
+        
+        digest = hashlib.sha256(f"{team_url}|{folder_path}".encode('utf-8')).hexdigest()
+        return cache_dir / f"{digest}.json"
+    
+    def _load_cached_listing(self, cache_file: Path, folder_etag: str) -> Optional[List[Dict]]:
+        """Load a cached folder listing if it is recent and matches the folder eTag"""
+        try:
+            if time.time() - cache_file.stat().st_mtime > LISTING_CACHE_TTL:
+                return None
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            if cached.get("etag") != folder_etag:
+                return None
             
-        except Exception as e:
-            logger.error(f"Error getting files: {e}")
-            raise
+            # Download URLs are never read from the cache; they are rebuilt
+            # from the item IDs so the bearer token only ever goes to Graph
+            return [
+                dict(item, download_url=self._content_url(item)) if item.get("type") == "file" else item
+                for item in cached["files"]
+            ]
+        except (AttributeError, KeyError, TypeError):
+            return None
+    
+    def _content_url(self, item: Dict) -> str:
+        """Get the Graph content endpoint of a listed file, or "" if it has no drive ID"""
+        drive_id = item.get("drive_id")
+        item_id = item.get("id")
+        if not drive_id or not item_id:
+            return ""
+        return f"{GRAPH_ROOT}v1.0/drives/{drive_id}/items/{item_id}/content"
+    
+    def _store_cached_listing(self, cache_file: Path, folder_etag: str, items: List[Dict]) -> None:
+        """Persist a folder listing to the cache, replacing any older copy atomically"""
+        # Pre-authenticated download URLs expire after a short time and are
+        # rebuilt on load, so they are left out
+        cached_items = [
+            {key: value for key, value in item.items() if key != "download_url"}
+            for item in items
+        ]
+        
+        try:
+            data = json.dumps({"etag": folder_etag, "files": cached_items}, ensure_ascii=False)
+            write_private_file(cache_file, data.encode('utf-8'))
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not write folder listing cache: {e}")
+    
+    async def get_item_etag(self, file_info: Dict) -> Optional[str]:
+        """Get the current eTag of a listed file from SharePoint
+        
+        Listings may come from the cache, so their eTags can be out of date;
+        this asks Graph for the file's version as it is now. Returns None if
+        it cannot be read, e.g. for entries listed without a drive ID.
+        """
+        drive_id = file_info.get("drive_id")
+        item_id = file_info.get("id")
+        if not self.authenticated or not drive_id or not item_id:
+            return None
+        
+        item_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{item_id}"
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Accept": "application/json"
+        }
+        return await self._run_blocking(self._get_item_etag, item_url, headers)
     
     async def download_file(self, file_info: Dict, local_path: str) -> bool:
         """Download a file from SharePoint using Microsoft Graph"""
@@ -269,24 +575,34 @@ class SharePointClient:
             if not download_url:
                 raise Exception("No download URL available for file")
             
-            headers = {
-                "Authorization": f"Bearer {self.access_token}"
-            }
+            # Pre-authenticated download URLs need no token, and the token
+            # must never be sent to a host other than Graph
+            headers = {}
+            if download_url.startswith(GRAPH_ROOT):
+                headers["Authorization"] = f"Bearer {self.access_token}"
             
-            response = requests.get(download_url, headers=headers)
+            # The transfer blocks, so run it in a worker thread; several
+            # downloads can then proceed at the same time
+            return await self._run_blocking(self._stream_to_file, download_url, headers, local_path)
             
+        except Exception as e:
+            logger.error(f"Error downloading file: {e}")
+            return False
+    
+    def _stream_to_file(self, download_url: str, headers: Dict, local_path: str) -> bool:
+        """Stream a download to disk (blocking)"""
+        # Stream the response to disk in chunks so large workbooks are never
+        # held in memory as a single bytes object
+        with self.session.get(download_url, headers=headers, stream=True) as response:
             if response.status_code == 200:
                 with open(local_path, 'wb') as local_file:
-                    local_file.write(response.content)
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        local_file.write(chunk)
                 logger.info(f"File downloaded successfully to {local_path}")
                 return True
             else:
                 logger.error(f"Failed to download file: {response.status_code}")
                 return False
-            
-        except Exception as e:
-            logger.error(f"Error downloading file: {e}")
-            return False
     
     async def upload_file(self, local_path: str, team_url: str, folder_path: str, filename: str) -> bool:
         """Upload a file to SharePoint using Microsoft Graph"""
@@ -294,36 +610,86 @@ class SharePointClient:
             if not self.authenticated:
                 raise Exception("Not authenticated")
             
-            # Get site ID
-            site_id = self._get_site_id_from_url(team_url)
-            if not site_id:
-                raise Exception("Could not get site information")
-            
-            # Read local file
-            with open(local_path, 'rb') as local_file:
-                file_content = local_file.read()
-            
-            # Construct upload URL
-            if folder_path and folder_path.strip():
-                folder_path = folder_path.strip('/')
-                upload_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{folder_path}/{filename}:/content"
-            else:
-                upload_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{filename}:/content"
-            
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/octet-stream"
-            }
-            
-            response = requests.put(upload_url, headers=headers, data=file_content)
-            
-            if response.status_code in [200, 201]:
-                logger.info(f"File uploaded successfully: {filename}")
-                return True
-            else:
-                logger.error(f"Failed to upload file: {response.status_code} - {response.text}")
-                return False
+            # The site lookup and transfer block, so run them in a worker thread
+            return await self._run_blocking(self._upload_to_folder, local_path, team_url, folder_path, filename)
             
         except Exception as e:
             logger.error(f"Error uploading file: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _upload_to_folder(self, local_path: str, team_url: str, folder_path: str, filename: str) -> bool:
+        """Upload a file in one request, or in slices if it is large (blocking)"""
+        # Get site ID
+        site_id = self._get_site_id_from_url(team_url)
+        if not site_id:
+            raise Exception("Could not get site information")
+        
+        # Construct the drive item path of the uploaded file
+        if folder_path and folder_path.strip():
+            folder_path = folder_path.strip('/')
+            item_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{folder_path}/{filename}:"
+        else:
+            item_url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{filename}:"
+        
+        file_size = os.path.getsize(local_path)
+        with open(local_path, 'rb') as local_file:
+            if file_size <= SIMPLE_UPLOAD_LIMIT:
+                headers = {
+                    "Authorization": f"Bearer {self.access_token}",
+                    "Content-Type": "application/octet-stream"
+                }
+                response = self.session.put(f"{item_url}/content", headers=headers, data=local_file.read())
+            else:
+                response = self._upload_in_slices(item_url, local_file, file_size)
+        
+        if response.status_code in [200, 201]:
+            logger.info(f"File uploaded successfully: {filename}")
+            return True
+        else:
+            logger.error(f"Failed to upload file: {response.status_code} - {response.text}")
+            return False
+    
+    def _upload_in_slices(self, item_url: str, local_file, file_size: int) -> requests.Response:
+        """Send a large file through a Graph upload session, one slice at a time (blocking)"""
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Accept": "application/json"
+        }
+        response = self.session.post(f"{item_url}/createUploadSession", headers=headers, json={
+            "item": {"@microsoft.graph.conflictBehavior": "replace"}
+        })
+        if response.status_code != 200:
+            return response
+        upload_url = _response_json(response)["uploadUrl"]
+        
+        # Only one slice is held in memory at a time. The upload URL is
+        # pre-authenticated and must be called without the bearer token
+        try:
+            offset = 0
+            while offset < file_size:
+                chunk = local_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    raise Exception("File changed size during upload")
+                end = offset + len(chunk) - 1
+                response = self.session.put(upload_url, data=chunk, headers={
+                    "Content-Length": str(len(chunk)),
+                    "Content-Range": f"bytes {offset}-{end}/{file_size}"
+                })
+                if response.status_code not in [200, 201, 202]:
+                    break
+                offset = end + 1
+        except Exception:
+            self._cancel_upload_session(upload_url)
+            raise
+        
+        # A failed slice leaves the session open, so discard the partial upload
+        if response.status_code not in [200, 201, 202]:
+            self._cancel_upload_session(upload_url)
+        return response
+    
+    def _cancel_upload_session(self, upload_url: str) -> None:
+        """Delete an upload session and the slices sent so far (blocking)"""
+        try:
+            self.session.delete(upload_url)
+        except requests.RequestException as e:
+            logger.warning(f"Could not cancel upload session: {e}")
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Tests for the per-user cache storage
+"""
+import os
+
+import pytest
+
+from sharepoint_excel_manager import cache
+from sharepoint_excel_manager.cache import private_cache_dir, write_private_file
+
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason="POSIX file modes and ownership")
+
+
+@pytest.fixture
+def cache_root(tmp_path, monkeypatch):
+    """Cache root inside a per-test temp directory"""
+    root = tmp_path / "cache"
+    monkeypatch.setattr(cache, "CACHE_ROOT", root)
+    return root
+
+
+class TestPrivateCache:
+    def test_cache_dir_is_private(self, cache_root):
+        """Test that cache directories are created with mode 0700"""
+        cache_dir = private_cache_dir("listings")
+        
+        assert cache_dir == cache_root / "listings"
+        assert cache_root.stat().st_mode & 0o777 == 0o700
+        assert cache_dir.stat().st_mode & 0o777 == 0o700
+    
+    def test_cache_dir_permissions_are_tightened(self, cache_root):
+        """Test that an existing cache directory of the user is closed to others"""
+        (cache_root / "files").mkdir(parents=True)
+        os.chmod(cache_root / "files", 0o777)
+        
+        cache_dir = private_cache_dir("files")
+        
+        assert cache_dir.stat().st_mode & 0o777 == 0o700
+    
+    def test_foreign_cache_dir_is_refused(self, cache_root, monkeypatch):
+        """Test that a cache directory owned by another user is not used"""
+        cache_root.mkdir()
+        monkeypatch.setattr(os, "getuid", lambda: cache_root.stat().st_uid + 1)
+        
+        with pytest.raises(PermissionError):
+            private_cache_dir("listings")
+    
+    def test_symlinked_cache_dir_is_refused(self, cache_root, tmp_path):
+        """Test that a symlink in place of a cache directory is not followed"""
+        cache_root.mkdir()
+        (tmp_path / "elsewhere").mkdir()
+        (cache_root / "listings").symlink_to(tmp_path / "elsewhere")
+        
+        with pytest.raises(PermissionError):
+            private_cache_dir("listings")
+    
+    def test_write_private_file(self, tmp_path):
+        """Test that cache files are written with mode 0600, replacing older ones"""
+        path = tmp_path / "entry.json"
+        path.write_text("old")
+        os.chmod(path, 0o644)
+        
+        write_private_file(path, b"new")
+        
+        assert path.read_bytes() == b"new"
+        assert path.stat().st_mode & 0o777 == 0o600
+        assert not path.with_name("entry.json.tmp").exists()
@@ -0,0 +1,291 @@
+"""
+Tests for Excel file management functionality
+"""
+import asyncio
+import os
+import re
+import shutil
+import zipfile
+from unittest.mock import Mock
+
+import openpyxl
+import pytest
+from openpyxl.worksheet.table import Table, TableStyleInfo
+
+from sharepoint_excel_manager import cache, excel_manager
+from sharepoint_excel_manager.excel_manager import ExcelManager, TableInfo
+
+
+def _rewrite_parts(path, part_prefix, pattern, replacement):
+    """Copy a workbook, substituting pattern in the package parts whose names start with part_prefix"""
+    rewritten = path.with_name(f"rewritten_{path.name}")
+    with zipfile.ZipFile(path) as source, zipfile.ZipFile(rewritten, "w") as target:
+        for info in source.infolist():
+            data = source.read(info.filename)
+            if info.filename.startswith(part_prefix):
+                data = re.sub(pattern, replacement, data)
+            target.writestr(info, data)
+    return rewritten
+
+
+def _remove_dimensions(path):
+    """Rewrite a workbook so its sheets have no <dimension> element, as some writers produce"""
+    return _rewrite_parts(path, "xl/worksheets/sheet", rb"<dimension[^>]*/>", b"")
+
+
+def _add_table(worksheet, name, ref, styled=True):
+    """Define an Excel Table over ref on the worksheet"""
+    table = Table(displayName=name, ref=ref)
+    if styled:
+        table.tableStyleInfo = TableStyleInfo(name="TableStyleMedium9")
+    worksheet.add_table(table)
+
+
+def _save_workbook(path, with_tables=True):
+    """Save a workbook with a Sales table on its first sheet and a Costs table on its second"""
+    workbook = openpyxl.Workbook()
+    sales = workbook.active
+    sales.title = "Sales"
+    sales.append(["Region", "Amount"])
+    sales.append(["North", 10])
+    sales.append(["South", 20])
+    
+    costs = workbook.create_sheet("Costs")
+    costs.append([None, None])
+    costs.append([None, "Item", "Cost"])
+    costs.append([None, "Rent", 500])
+    
+    if with_tables:
+        _add_table(sales, "SalesTable", "A1:B3")
+        _add_table(costs, "CostsTable", "B2:C3", styled=False)
+    
+    workbook.save(path)
+    return path
+
+
+class StubClient:
+    """SharePoint client stand-in whose downloads copy a local workbook"""
+    
+    def __init__(self, workbook_path, failing_names=()):
+        self.workbook_path = workbook_path
+        self.failing_names = set(failing_names)
+        self.active_downloads = 0
+        self.max_active_downloads = 0
+    
+    async def get_item_etag(self, file_info):
+        return None
+    
+    async def download_file(self, file_info, local_path):
+        self.active_downloads += 1
+        self.max_active_downloads = max(self.max_active_downloads, self.active_downloads)
+        try:
+            # Yield so other downloads can start while this one is running
+            await asyncio.sleep(0.01)
+            if file_info["name"] in self.failing_names:
+                return False
+            shutil.copyfile(self.workbook_path, local_path)
+            return True
+        finally:
+            self.active_downloads -= 1
+
+
+@pytest.fixture
+def open_workbook():
+    """Open workbook files in ExcelManagers that are cleaned up after the test"""
+    managers = []
+    
+    def open_workbook(path):
+        manager = ExcelManager(Mock())
+        manager.current_file_path = str(path)
+        manager.current_file_info = {"name": path.name}
+        manager._open_workbook()
+        managers.append(manager)
+        return manager
+    
+    yield open_workbook
+    
+    for manager in managers:
+        manager.cleanup()
+
+
+class TestTableInfo:
+    def test_to_dict_from_dict_round_trip(self):
+        """Test that table info survives conversion to a dictionary and back"""
+        table = TableInfo(
+            name="SalesTable",
+            type="table",
+            worksheet="Sales",
+            has_data=True,
+            has_headers=True,
+            header_row=1,
+            total_rows=3,
+            total_columns=2,
+            data_rows=2,
+            sample_headers=["Region", "Amount"],
+            range="A1:B3",
+            description="Excel Table 'SalesTable' in sheet 'Sales' (2 data rows)"
+        )
+        
+        data = table.to_dict()
+        
+        assert set(data) == set(TableInfo.__slots__)
+        assert data["sample_headers"] == ["Region", "Amount"]
+        assert TableInfo.from_dict(data) == table
+        # Keys that are not fields are ignored
+        assert TableInfo.from_dict(dict(data, unknown_field="ignored")) == table
+
+
+class TestExcelManager:
+    def test_unsized_empty_sheet(self, tmp_path, open_workbook):
+        """Test that an empty sheet without a stored dimension is reported as empty"""
+        workbook = openpyxl.Workbook()
+        workbook.active.title = "Data"
+        workbook.active.append(["Name", "Value"])
+        workbook.active.append(["a", 1])
+        workbook.create_sheet("Empty")
+        path = tmp_path / "book.xlsx"
+        workbook.save(path)
+        
+        manager = open_workbook(_remove_dimensions(path))
+        tables = manager.get_available_tables()
+        
+        # The empty sheet does not stop the rest of the workbook being scanned
+        assert [table.name for table in tables] == ["Data", "Empty"]
+        assert tables[0].has_data is True
+        assert tables[0].total_rows == 2
+        assert tables[1].has_data is False
+        assert tables[1].total_rows == 0
+
+    
+    def test_read_excel_tables(self, tmp_path, open_workbook):
+        """Test reading Table definitions from the first and a later sheet"""
+        manager = open_workbook(_save_workbook(tmp_path / "book.xlsx"))
+        
+        assert manager._read_excel_tables() == {
+            "Sales": [{"name": "SalesTable", "ref": "A1:B3", "has_style_info": True}],
+            "Costs": [{"name": "CostsTable", "ref": "B2:C3", "has_style_info": False}],
+        }
+    
+    def test_read_excel_tables_without_tables(self, tmp_path, open_workbook):
+        """Test that a workbook without Tables has no Table definitions"""
+        manager = open_workbook(_save_workbook(tmp_path / "book.xlsx", with_tables=False))
+        
+        assert manager._read_excel_tables() == {}
+    
+    @pytest.mark.parametrize("target", [b"/xl/tables/table1.xml", b"../tables/table1.xml"])
+    def test_read_excel_tables_relationship_targets(self, tmp_path, open_workbook, target):
+        """Test resolving both absolute and sheet-relative Table part targets"""
+        path = _save_workbook(tmp_path / "book.xlsx")
+        path = _rewrite_parts(path, "xl/worksheets/_rels/sheet1.xml.rels", rb'Target="[^"]*"', b'Target="' + target + b'"')
+        manager = open_workbook(path)
+        
+        assert manager._read_excel_tables()["Sales"] == [
+            {"name": "SalesTable", "ref": "A1:B3", "has_style_info": True}
+        ]
+    
+    def test_available_tables_include_excel_tables(self, tmp_path, open_workbook):
+        """Test that each Table is listed after the worksheet it is defined on"""
+        manager = open_workbook(_save_workbook(tmp_path / "book.xlsx"))
+        tables = manager.get_available_tables()
+        
+        assert [(table.name, table.type) for table in tables] == [
+            ("Sales", "worksheet"), ("SalesTable", "table"),
+            ("Costs", "worksheet"), ("CostsTable", "table"),
+        ]
+        assert tables[1].worksheet == "Sales"
+        assert tables[1].sample_headers == ["Region", "Amount"]
+        assert tables[1].data_rows == 2
+        # Headers are only read for Tables that carry style info
+        assert tables[3].worksheet == "Costs"
+        assert tables[3].sample_headers == []
+    
+    def test_available_tables_are_table_info(self, tmp_path, open_workbook):
+        """Test that the scan returns TableInfo records with the expected fields"""
+        manager = open_workbook(_save_workbook(tmp_path / "book.xlsx", with_tables=False))
+        tables = manager.get_available_tables()
+        
+        assert all(isinstance(table, TableInfo) for table in tables)
+        assert tables[0] == TableInfo(
+            name="Sales",
+            type="worksheet",
+            worksheet=None,
+            has_data=True,
+            has_headers=True,
+            header_row=1,
+            total_rows=3,
+            total_columns=2,
+            data_rows=2,
+            sample_headers=["Region", "Amount"],
+            range=None,
+            description="Worksheet 'Sales' (2 rows, 2 columns) - Headers: Region, Amount"
+        )
+        # Headers are sampled from the first non-empty column
+        assert tables[1].header_row == 2
+        assert tables[1].sample_headers == ["Item", "Cost"]
+    
+    @pytest.mark.asyncio
+    async def test_download_and_open_many(self, tmp_path, monkeypatch):
+        """Test opening several files with a bounded number of concurrent downloads"""
+        monkeypatch.setattr(excel_manager, "MAX_CONCURRENT_DOWNLOADS", 2)
+        client = StubClient(_save_workbook(tmp_path / "book.xlsx"), failing_names={"book3.xlsx"})
+        file_infos = [{"id": f"file{i}", "name": f"book{i}.xlsx"} for i in range(5)]
+        
+        managers = await ExcelManager.download_and_open_many(client, file_infos)
+        try:
+            # One manager per file, in order; the failed download is not open
+            assert [manager.current_file_info for manager in managers] == file_infos
+            assert [manager.is_file_open() for manager in managers] == [True, True, True, False, True]
+            assert client.max_active_downloads == 2
+        finally:
+            for manager in managers:
+                manager.cleanup()
+    
+    @pytest.mark.skipif(os.name != 'posix', reason="POSIX file modes")
+    def test_cached_workbook_is_private(self, tmp_path, monkeypatch):
+        """Test that cached workbooks and their eTags are readable only by the user"""
+        monkeypatch.setattr(cache, "CACHE_ROOT", tmp_path / "cache")
+        manager = ExcelManager(Mock())
+        manager.current_file_path = str(_save_workbook(tmp_path / "book.xlsx"))
+        
+        cached_file = manager._cached_file_path({"id": "file1", "name": "book.xlsx"})
+        manager._store_cached_file(cached_file, "etag1")
+        
+        assert cached_file.parent == tmp_path / "cache" / excel_manager.FILE_CACHE_NAME
+        assert cached_file.stat().st_mode & 0o777 == 0o600
+        assert cached_file.with_suffix('.etag').stat().st_mode & 0o777 == 0o600
+        assert cached_file.with_suffix('.etag').read_text() == "etag1"
+    
+    def test_evict_cached_files_keeps_newest(self, tmp_path, monkeypatch):
+        """Test that the least recently used workbooks are evicted over the size limit"""
+        monkeypatch.setattr(excel_manager, "FILE_CACHE_MAX_BYTES", 250)
+        for age, name in enumerate(["new", "middle", "old"]):
+            workbook = tmp_path / f"{name}.xlsx"
+            workbook.write_bytes(b"x" * 100)
+            workbook.with_suffix('.etag').write_text(name)
+            os.utime(workbook, (1000 - age, 1000 - age))
+        
+        ExcelManager(Mock())._evict_cached_files(tmp_path)
+        
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "middle.etag", "middle.xlsx", "new.etag", "new.xlsx"
+        ]
+    
+    @pytest.mark.skipif(os.name != 'posix', reason="POSIX file modes")
+    def test_cached_metadata_is_private(self, tmp_path, monkeypatch):
+        """Test that table metadata is cached per user and read back for the same version"""
+        monkeypatch.setattr(cache, "CACHE_ROOT", tmp_path / "cache")
+        manager = ExcelManager(Mock())
+        tables = [TableInfo(
+            name="Sheet1", type="worksheet", worksheet=None, has_data=True,
+            has_headers=True, header_row=1, total_rows=2, total_columns=2,
+            data_rows=1, sample_headers=["Item", "Cost"], range=None,
+            description="Worksheet 'Sheet1'"
+        )]
+        
+        cache_file = manager._metadata_cache_file({"id": "file1", "name": "book.xlsx"}, "etag1")
+        manager._store_cached_metadata(cache_file, tables)
+        
+        assert cache_file.parent == tmp_path / "cache" / excel_manager.METADATA_CACHE_NAME
+        assert cache_file.stat().st_mode & 0o777 == 0o600
+        assert manager._load_cached_metadata(cache_file) == tables
+        assert manager._metadata_cache_file({"id": "file1", "name": "book.xlsx"}, None) is None
@@ -2,12 +2,14 @@
 Tests for settings management functionality
 """
 import json
-import tempfile
+import sys
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 import pytest
 
+from sharepoint_excel_manager import settings as settings_module
 from sharepoint_excel_manager.settings import AppSettings, SettingsManager
 
 
@@ -62,18 +64,22 @@ class TestAppSettings:
         assert not hasattr(settings, "unknown_field")
 
 
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Settings manager whose config directory is a per-test temp directory"""
+    monkeypatch.setattr(SettingsManager, '_get_config_directory', lambda self: tmp_path / "test_app")
+    return SettingsManager("TestApp")
+
+
 class TestSettingsManager:
-    def test_init_creates_config_dir(self):
+    def test_init_creates_config_dir(self, tmp_path):
         """Test that initialization creates config directory"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with patch.object(SettingsManager, '_get_config_directory', return_value=Path(temp_dir) / "test_app"):
-                manager = SettingsManager("TestApp")
-                assert manager._config_dir.exists()
+        with patch.object(SettingsManager, '_get_config_directory', return_value=tmp_path / "test_app"):
+            manager = SettingsManager("TestApp")
+            assert manager._config_dir.exists()
     
-    def test_get_set_settings(self):
+    def test_get_set_settings(self, manager):
         """Test getting and setting individual settings"""
-        manager = SettingsManager("TestApp")
-        
         # Test setting and getting
         manager.set("team_url", "https://test.sharepoint.com")
         assert manager.get("team_url") == "https://test.sharepoint.com"
@@ -85,10 +91,8 @@ class TestSettingsManager:
         with pytest.raises(AttributeError):
             manager.set("invalid_key", "value")
     
-    def test_update_multiple_settings(self):
+    def test_update_multiple_settings(self, manager):
         """Test updating multiple settings at once"""
-        manager = SettingsManager("TestApp")
-        
         manager.update(
             team_url="https://example.com",
             document_folder="/docs",
@@ -99,62 +103,113 @@ class TestSettingsManager:
         assert manager.get("document_folder") == "/docs"
         assert manager.get("window_width") == 1024
     
-    def test_save_and_load(self):
+    def test_save_and_load(self, tmp_path):
         """Test saving and loading settings"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config_dir = Path(temp_dir) / "test_app"
+        config_dir = tmp_path / "test_app"
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            # Create manager and set some values
+            manager1 = SettingsManager("TestApp")
+            manager1.update(
+                team_url="https://test.com",
+                document_folder="/test",
+                window_width=1200
+            )
             
-            with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
-                # Create manager and set some values
-                manager1 = SettingsManager("TestApp")
-                manager1.update(
-                    team_url="https://test.com",
-                    document_folder="/test",
-                    window_width=1200
-                )
-                
-                # Save settings
-                assert manager1.save() is True
+            # Save settings
+            assert manager1.save() is True
+            
+            # Create new manager and verify settings loaded
+            manager2 = SettingsManager("TestApp")
+            assert manager2.get("team_url") == "https://test.com"
+            assert manager2.get("document_folder") == "/test"
+            assert manager2.get("window_width") == 1200
+    
+    def test_save_skips_unchanged_settings(self, tmp_path):
+        """Test that saving without changes does not rewrite the file"""
+        config_dir = tmp_path / "test_app"
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            manager = SettingsManager("TestApp")
+            manager.set("team_url", "https://test.com")
+            assert manager.save() is True
+            
+            with patch('os.replace') as mock_replace:
+                # Setting the same value again does not mark settings changed
+                manager.set("team_url", "https://test.com")
+                assert manager.save() is True
+                mock_replace.assert_not_called()
                 
-                # Create new manager and verify settings loaded
-                manager2 = SettingsManager("TestApp")
-                assert manager2.get("team_url") == "https://test.com"
-                assert manager2.get("document_folder") == "/test"
-                assert manager2.get("window_width") == 1200
+                manager.set("team_url", "https://other.com")
+                assert manager.save() is True
+                mock_replace.assert_called_once()
+    
+    def test_save_writes_direct_changes(self, tmp_path):
+        """Test that changes made on the settings object itself are saved"""
+        config_dir = tmp_path / "test_app"
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            manager1 = SettingsManager("TestApp")
+            assert manager1.save() is True
+            
+            manager1.settings.team_url = "https://direct.test.com"
+            assert manager1.save() is True
+            
+            manager2 = SettingsManager("TestApp")
+            assert manager2.get("team_url") == "https://direct.test.com"
+    
+    def test_save_rewrites_deleted_file(self, tmp_path):
+        """Test that saving unchanged settings recreates a deleted settings file"""
+        config_dir = tmp_path / "test_app"
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            manager = SettingsManager("TestApp")
+            manager.set("team_url", "https://test.com")
+            assert manager.save() is True
+            
+            manager.config_file.unlink()
+            assert manager.save() is True
+            assert manager.config_file.exists()
+    
+    def test_save_syncs_before_replace(self, manager):
+        """Test that the settings are flushed to disk before the file is swapped in"""
+        calls = Mock()
+        manager.set("team_url", "https://test.com")
+        
+        with patch('os.fsync', calls.fsync), patch('os.replace', calls.replace):
+            assert manager.save() is True
+        
+        assert [name for name, _, _ in calls.mock_calls] == ["fsync", "replace"]
     
-    def test_load_nonexistent_file(self):
+    def test_load_nonexistent_file(self, tmp_path):
         """Test loading when no settings file exists"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config_dir = Path(temp_dir) / "nonexistent_app"
+        config_dir = tmp_path / "nonexistent_app"
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            manager = SettingsManager("NonexistentApp")
             
-            with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
-                manager = SettingsManager("NonexistentApp")
-                
-                # Should use default values
-                assert manager.get("team_url") == ""
-                assert manager.get("window_width") == 800
+            # Should use default values
+            assert manager.get("team_url") == ""
+            assert manager.get("window_width") == 800
     
-    def test_load_invalid_json(self):
+    def test_load_invalid_json(self, tmp_path):
         """Test loading corrupted settings file"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config_dir = Path(temp_dir) / "test_app"
-            config_dir.mkdir()
-            
-            # Create invalid JSON file
-            config_file = config_dir / "settings.json"
-            config_file.write_text("invalid json content")
+        config_dir = tmp_path / "test_app"
+        config_dir.mkdir()
+        
+        # Create invalid JSON file
+        config_file = config_dir / "settings.json"
+        config_file.write_text("invalid json content")
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            manager = SettingsManager("TestApp")
             
-            with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
-                manager = SettingsManager("TestApp")
-                
-                # Should fall back to defaults
-                assert manager.get("team_url") == ""
-                assert manager.get("window_width") == 800
+            # Should fall back to defaults
+            assert manager.get("team_url") == ""
+            assert manager.get("window_width") == 800
     
-    def test_reset_to_defaults(self):
+    def test_reset_to_defaults(self, manager):
         """Test resetting settings to defaults"""
-        manager = SettingsManager("TestApp")
-        
         # Set some custom values
         manager.update(
             team_url="https://custom.com",
@@ -166,10 +221,8 @@ class TestSettingsManager:
         assert manager.get("team_url") == ""
         assert manager.get("window_width") == 800
     
-    def test_recent_connections(self):
+    def test_recent_connections(self, manager):
         """Test recent connections functionality"""
-        manager = SettingsManager("TestApp")
-        
         # Initially no recent connections
         recent = manager.get_recent_connections()
         assert len(recent) == 0
@@ -183,75 +236,63 @@ class TestSettingsManager:
         assert recent[0]["folder"] == "/docs"
         assert recent[0]["last_used"] == "current"
     
-    def test_export_import_settings(self):
+    def test_export_import_settings(self, tmp_path):
         """Test exporting and importing settings"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config_dir = Path(temp_dir) / "test_app"
-            export_file = Path(temp_dir) / "exported_settings.json"
+        config_dir = tmp_path / "test_app"
+        export_file = tmp_path / "exported_settings.json"
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            # Create manager with custom settings
+            manager1 = SettingsManager("TestApp")
+            manager1.update(
+                team_url="https://export.test.com",
+                document_folder="/export_test",
+                window_width=1400,
+                theme="dark"
+            )
             
-            with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
-                # Create manager with custom settings
-                manager1 = SettingsManager("TestApp")
-                manager1.update(
-                    team_url="https://export.test.com",
-                    document_folder="/export_test",
-                    window_width=1400,
-                    theme="dark"
-                )
-                
-                # Export settings
-                assert manager1.export_settings(export_file) is True
-                assert export_file.exists()
-                
-                # Create new manager and import settings
-                manager2 = SettingsManager("TestApp2")
-                assert manager2.import_settings(export_file) is True
-                
-                # Verify imported settings
-                assert manager2.get("team_url") == "https://export.test.com"
-                assert manager2.get("document_folder") == "/export_test"
-                assert manager2.get("window_width") == 1400
-                assert manager2.get("theme") == "dark"
+            # Export settings
+            assert manager1.export_settings(export_file) is True
+            assert export_file.exists()
+            
+            # Create new manager and import settings
+            manager2 = SettingsManager("TestApp2")
+            assert manager2.import_settings(export_file) is True
+            
+            # Verify imported settings
+            assert manager2.get("team_url") == "https://export.test.com"
+            assert manager2.get("document_folder") == "/export_test"
+            assert manager2.get("window_width") == 1400
+            assert manager2.get("theme") == "dark"
     
-    def test_context_manager(self):
+    def test_context_manager(self, tmp_path):
         """Test using SettingsManager as context manager"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            config_dir = Path(temp_dir) / "test_app"
+        config_dir = tmp_path / "test_app"
+        
+        with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
+            # Use as context manager
+            with SettingsManager("TestApp") as manager:
+                manager.set("team_url", "https://context.test.com")
+                # Settings should be automatically saved on exit
             
-            with patch.object(SettingsManager, '_get_config_directory', return_value=config_dir):
-                # Use as context manager
-                with SettingsManager("TestApp") as manager:
-                    manager.set("team_url", "https://context.test.com")
-                    # Settings should be automatically saved on exit
-                
-                # Verify settings were saved
-                manager2 = SettingsManager("TestApp")
-                assert manager2.get("team_url") == "https://context.test.com"
+            # Verify settings were saved
+            manager2 = SettingsManager("TestApp")
+            assert manager2.get("team_url") == "https://context.test.com"
     
-    @patch('os.name', 'nt')
-    @patch.dict('os.environ', {'APPDATA': '/fake/appdata'})
-    def test_get_config_directory_windows(self):
-        """Test config directory detection on Windows"""
-        manager = SettingsManager("TestApp")
-        expected = Path("/fake/appdata/SharePointExcelManager")
-        assert manager._config_dir == expected
-    
-    @patch('os.name', 'posix')
-    @patch('os.sys.platform', 'darwin')
-    def test_get_config_directory_macos(self):
-        """Test config directory detection on macOS"""
-        with patch('pathlib.Path.home') as mock_home:
-            mock_home.return_value = Path('/Users/testuser')
-            manager = SettingsManager("TestApp")
-            expected = Path("/Users/testuser/Library/Application Support/SharePointExcelManager")
-            assert manager._config_dir == expected
-    
-    @patch('os.name', 'posix')
-    @patch('os.sys.platform', 'linux')
-    def test_get_config_directory_linux(self):
-        """Test config directory detection on Linux"""
-        with patch('pathlib.Path.home') as mock_home:
-            mock_home.return_value = Path('/home/testuser')
-            manager = SettingsManager("TestApp")
-            expected = Path("/home/testuser/.config/SharePointExcelManager")
-            assert manager._config_dir == expected
\ No newline at end of file
+    @pytest.mark.parametrize("os_name,platform,home,expected", [
+        ("nt", "win32", "C:/Users/testuser", Path("/fake/appdata/SharePointExcelManager")),
+        ("posix", "darwin", "/Users/testuser", Path("/Users/testuser/Library/Application Support/SharePointExcelManager")),
+        ("posix", "linux", "/home/testuser", Path("/home/testuser/.config/SharePointExcelManager")),
+    ])
+    def test_get_config_directory(self, monkeypatch, os_name, platform, home, expected):
+        """Test config directory detection on each platform"""
+        # Only the settings module sees the patched OS name, so pathlib keeps
+        # building native paths on the machine running the tests
+        monkeypatch.setattr(settings_module, "os", SimpleNamespace(name=os_name, environ={"APPDATA": "/fake/appdata"}))
+        monkeypatch.setattr(sys, "platform", platform)
+        monkeypatch.setattr(Path, "home", lambda: Path(home))
+        # Only the path is checked, so do not create it
+        monkeypatch.setattr(Path, "mkdir", lambda self, *args, **kwargs: None)
+        
+        manager = SettingsManager()
+        assert manager._config_dir == expected
\ No newline at end of file